@@ -0,0 +1,297 @@
+"""
+Пропускная способность ленты и страницы новости под WSGI и под ASGI
+при множестве медленных клиентов.
+
+WSGI-сервер обслуживает запросы фиксированным пулом потоков, как
+gthread-воркер gunicorn: медленный клиент занимает поток, пока передаёт
+запрос. ASGI-сервер принимает соединения в цикле событий, а ленту и
+страницу новости отдают асинхронные представления (NEWS_ASYNC_VIEWS),
+обращающиеся к базе через пул того же размера. Ни сторонний
+WSGI-, ни ASGI-сервер в зависимостях не значатся, поэтому минимальный
+HTTP/1.1-сервер для ASGI реализован здесь же.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_asgi --clients 64 --client-delay 0.05
+
+Режим asgi-sync — тот же ASGI-сервер с синхронными представлениями,
+которые Django 3.2 выполняет в одном общем потоке.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+
+from benchmarks.bench_load import (free_port, git_revision, peak_rss_mb,
+                                   seed_news, summarize)
+from benchmarks.utils import BASE_DIR
+
+MODES = ('wsgi', 'asgi-sync', 'asgi')
+
+
+def serve_wsgi(application, port, workers, ready):
+    from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    class PooledWSGIServer(WSGIServer):
+        """WSGI-сервер с фиксированным числом рабочих потоков."""
+        request_queue_size = 1024
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.executor = ThreadPoolExecutor(workers)
+
+        def process_request(self, request, client_address):
+            self.executor.submit(self.process, request, client_address)
+
+        def process(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer(('127.0.0.1', port), QuietHandler)
+    server.set_app(application)
+    ready()
+    server.serve_forever()
+
+
+async def read_request(reader):
+    """Строка запроса, заголовки и тело HTTP/1.1 без chunked-кодирования."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, _ = request_line.decode('latin-1').split()
+    headers = []
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers.append(
+            (name.strip().lower().encode('latin-1'),
+             value.strip().encode('latin-1'))
+        )
+    length = int(dict(headers).get(b'content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+def serve_asgi(application, port, ready):
+    async def handle(reader, writer):
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            method, target, headers, body = request
+            path, _, query = target.partition('?')
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': method,
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': query.encode(),
+                'root_path': '',
+                'headers': headers,
+                'client': writer.get_extra_info('peername')[:2],
+                'server': ('127.0.0.1', port),
+            }
+
+            async def receive():
+                return {
+                    'type': 'http.request', 'body': body, 'more_body': False,
+                }
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status = HTTPStatus(message['status'])
+                    lines = [f'HTTP/1.1 {status.value} {status.phrase}']
+                    lines += [
+                        f'{name.decode("latin-1")}: {value.decode("latin-1")}'
+                        for name, value in message.get('headers', [])
+                    ]
+                    lines.append('Connection: close')
+                    writer.write(
+                        ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+                    )
+                elif message['type'] == 'http.response.body':
+                    writer.write(message.get('body', b''))
+                await writer.drain()
+
+            await application(scope, receive, send)
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(
+            handle, '127.0.0.1', port, backlog=1024
+        )
+        ready()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def serve(args):
+    """Процесс-сервер: база, данные, затем WSGI или ASGI до завершения."""
+    from benchmarks.utils import setup_django
+
+    setup_django(
+        'ya_news', database=args.database, settings=args.settings,
+        NEWS_ASYNC_VIEWS=args.serve == 'asgi',
+        NEWS_ASYNC_THREADS=args.workers,
+    )
+    from django.test.utils import teardown_test_environment
+
+    targets = seed_news(args.scale, [])
+    teardown_test_environment()
+    package = os.environ['DJANGO_SETTINGS_MODULE'].split('.')[0]
+    protocol = args.serve.split('-')[0]
+    module = importlib.import_module(f'{package}.{protocol}')
+
+    def ready():
+        print(json.dumps(targets), flush=True)
+
+    if protocol == 'wsgi':
+        serve_wsgi(module.application, args.port, args.workers, ready)
+    else:
+        serve_asgi(module.application, args.port, ready)
+
+
+def slow_get(port, path, delay):
+    """
+    GET, строка запроса и заголовки которого приходят с паузой delay.
+
+    Возвращает код ответа и время от подключения до конца ответа.
+    """
+    started = time.perf_counter()
+    with socket.create_connection(('127.0.0.1', port), timeout=120) as sock:
+        sock.sendall(f'GET {path} HTTP/1.1\r\n'.encode())
+        time.sleep(delay)
+        sock.sendall(
+            f'Host: 127.0.0.1:{port}\r\nConnection: close\r\n\r\n'.encode()
+        )
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    status_line = b''.join(chunks).split(b'\r\n', 1)[0].split()
+    status = int(status_line[1]) if len(status_line) > 1 else None
+    return status, time.perf_counter() - started
+
+
+def run_mode(args, mode):
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        command = [
+            sys.executable, '-m', 'benchmarks.bench_asgi', '--serve', mode,
+            '--scale', str(args.scale), '--workers', str(args.workers),
+            '--port', str(port),
+            '--database', str(Path(directory) / 'asgi.sqlite3'),
+        ]
+        if args.settings:
+            command += ['--settings', args.settings]
+        server = subprocess.Popen(
+            command, cwd=BASE_DIR, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            news_ids = json.loads(server.stdout.readline())['news']
+
+            def work(_):
+                results = []
+                for _ in range(args.iterations):
+                    for path in ('/', f'/news/{random.choice(news_ids)}/'):
+                        results.append(
+                            slow_get(port, path, args.client_delay)
+                        )
+                return results
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.clients) as pool:
+                results = [
+                    result
+                    for results in pool.map(work, range(args.clients))
+                    for result in results
+                ]
+            elapsed = time.perf_counter() - started
+            rss = peak_rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+    return {
+        'mode': mode,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(results) / elapsed, 1),
+        'errors': sum(status != HTTPStatus.OK for status, _ in results),
+        'latency_ms': summarize([seconds for _, seconds in results]),
+        'server_peak_rss_mb': rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--settings')
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument(
+        '--workers', type=int, default=8,
+        help='Потоки WSGI-сервера и пула асинхронных представлений.',
+    )
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument(
+        '--client-delay', type=float, default=0.05,
+        help='Пауза клиента посреди отправки запроса, в секундах.',
+    )
+    parser.add_argument('--output', help='Файл для JSON вместо stdout.')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    report = json.dumps(
+        {
+            'settings': args.settings or 'yanews.settings',
+            'revision': git_revision(),
+            'scale': args.scale,
+            'workers': args.workers,
+            'clients': args.clients,
+            'client_delay': args.client_delay,
+            'results': [run_mode(args, mode) for mode in MODES],
+        },
+        ensure_ascii=False,
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Сравнение проверки запрещённых слов: цикл по словарю против автомата.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_bad_words --words 5000 --text-length 10000
+"""
+import argparse
+import random
+
+from benchmarks.utils import setup_django, timed
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщэюя'
+
+
+def legacy_check(text, words):
+    """Прежняя реализация CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--text-length', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from news.matching import STEM, SUBSTRING, BadWordMatcher
+
+    rng = random.Random(args.seed)
+    words = [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(6, 10)))
+        for _ in range(args.words)
+    ]
+    text_words = []
+    while sum(map(len, text_words)) < args.text_length:
+        text_words.append(''.join(rng.choices(ALPHABET, k=rng.randint(2, 9))))
+    # Чистый текст — худший случай: обе реализации просматривают всё.
+    text = ' '.join(text_words)
+
+    results = {}
+    results['legacy loop'] = timed(lambda: legacy_check(text, words))
+    for mode in (SUBSTRING, STEM):
+        matcher = BadWordMatcher(words, mode=mode)
+        results[f'automaton, {mode}'] = timed(
+            lambda: matcher.matches(text)
+        )
+    results['automaton build'] = timed(
+        lambda: BadWordMatcher(words), repeat=1
+    )
+    print(f'Слов: {args.words}, длина текста: {len(text)}')
+    for name, seconds in results.items():
+        print(f'{name:>20}: {seconds * 1000:9.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
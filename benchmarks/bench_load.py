@@ -0,0 +1,344 @@
+"""
+Нагрузочный тест проектов ya_news и ya_note через настоящий HTTP.
+
+Для каждого масштаба данных запускается отдельный процесс-сервер:
+он создаёт файловую базу, наполняет её bulk-вставками и обслуживает
+yanews.wsgi или yanote.wsgi многопоточным WSGI-сервером. Клиентские
+потоки гоняют по ключевым маршрутам сценарий проекта:
+  ya_news — лента, страница новости, отправка комментария;
+  ya_note — создание, просмотр, правка и удаление заметки, список.
+Результат — JSON с пропускной способностью, квантилями задержки
+p50/p95/p99 по маршрутам и пиковым RSS сервера; его удобно сохранять
+и сравнивать между коммитами.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_load --project ya_news \\
+        --scales 100 10000 --concurrency 8 --output news.json
+"""
+import argparse
+import http.client
+import importlib
+import json
+import math
+import os
+import random
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.utils import BASE_DIR, PROJECTS
+
+# Django сверяет токен из заголовка с cookie, поэтому клиенту хватает
+# одной произвольной строки нужной длины в обоих местах.
+CSRF_TOKEN = ''.join(
+    random.choices(string.ascii_letters + string.digits, k=64)
+)
+COMMENTS_PER_NEWS = 10
+COMMENT_AUTHORS = 100
+QUANTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+
+
+def seed_news(scale, users):
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+
+    User = get_user_model()
+    News.objects.bulk_create(
+        (
+            News(title=f'Новость {i}', text='Текст новости')
+            for i in range(scale)
+        ),
+        batch_size=1000,
+    )
+    User.objects.bulk_create(
+        User(username=f'Комментатор {i}') for i in range(COMMENT_AUTHORS)
+    )
+    authors = list(User.objects.values_list('pk', flat=True))
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                news_id=news_id,
+                author_id=authors[i % len(authors)],
+                text=f'Комментарий {i}',
+            )
+            for news_id in news_ids
+            for i in range(COMMENTS_PER_NEWS)
+        ),
+        batch_size=1000,
+    )
+    return {'news': news_ids}
+
+
+def seed_notes(scale, users):
+    from notes.models import Note
+
+    for user in users:
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f'Заметка {i}',
+                    text='Текст заметки',
+                    slug=f'{user.pk}-{i}',
+                    author=user,
+                )
+                for i in range(scale)
+            ),
+            batch_size=1000,
+        )
+    return {}
+
+
+SEEDERS = {'ya_news': seed_news, 'ya_note': seed_notes}
+
+
+def serve(args):
+    """Процесс-сервер: база, данные, затем WSGI до завершения."""
+    from benchmarks.utils import setup_django
+
+    setup_django(args.project, database=args.database, settings=args.settings)
+    from django.contrib.auth import get_user_model
+    from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                              WSGIRequestHandler)
+    from django.test import Client
+    from django.test.utils import teardown_test_environment
+
+    users = [
+        get_user_model().objects.create(username=f'Нагрузка {worker}')
+        for worker in range(args.concurrency)
+    ]
+    targets = SEEDERS[args.project](args.scale, users)
+    sessions = []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        sessions.append(client.cookies['sessionid'].value)
+    # Шаблоны и почта дальше работают как в боевом режиме.
+    teardown_test_environment()
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    package = os.environ['DJANGO_SETTINGS_MODULE'].split('.')[0]
+    application = importlib.import_module(f'{package}.wsgi').application
+    server = ThreadedWSGIServer(('127.0.0.1', args.port), QuietHandler)
+    server.set_app(application)
+    print(json.dumps({**targets, 'sessions': sessions}), flush=True)
+    server.serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_mb(pid):
+    """Пиковый RSS процесса pid в мегабайтах (Linux)."""
+    for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+        if line.startswith('VmHWM:'):
+            return round(int(line.split()[1]) / 1024, 1)
+    return None
+
+
+class LoadClient:
+    """HTTP-клиент одного виртуального пользователя."""
+
+    def __init__(self, port, session=None):
+        self.port = port
+        self.cookie = f'csrftoken={CSRF_TOKEN}'
+        if session is not None:
+            self.cookie += f'; sessionid={session}'
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def request(self, route, path, data=None):
+        """GET, а при data — POST формы; успех — 200 и 302 соответственно."""
+        headers = {'Cookie': self.cookie}
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = CSRF_TOKEN
+        expected = http.client.OK if data is None else http.client.FOUND
+        connection = http.client.HTTPConnection(
+            '127.0.0.1', self.port, timeout=60
+        )
+        started = time.perf_counter()
+        try:
+            connection.request(
+                'GET' if data is None else 'POST', path, body, headers
+            )
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except OSError:
+            status = None
+        finally:
+            connection.close()
+        self.samples[route].append(time.perf_counter() - started)
+        if status != expected:
+            self.errors[route] += 1
+
+
+def news_scenario(client, worker, iteration, targets):
+    news_id = random.choice(targets['news'])
+    client.request('news:home', '/')
+    client.request('news:detail', f'/news/{news_id}/')
+    client.request(
+        'news:detail POST', f'/news/{news_id}/',
+        {'text': f'Комментарий под нагрузкой {worker}-{iteration}'},
+    )
+
+
+def notes_scenario(client, worker, iteration, targets):
+    slug = f'load-{worker}-{iteration}'
+    note = {'title': f'Заметка {slug}', 'text': 'Текст', 'slug': slug}
+    client.request('notes:add', '/add/', note)
+    client.request('notes:detail', f'/note/{slug}/')
+    client.request(
+        'notes:edit', f'/edit/{slug}/', {**note, 'text': 'Новый текст'}
+    )
+    client.request('notes:list', '/notes/')
+    client.request('notes:delete', f'/delete/{slug}/', {})
+
+
+SCENARIOS = {'ya_news': news_scenario, 'ya_note': notes_scenario}
+
+
+def percentile(ordered, quantile):
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'requests': len(ordered),
+        **{
+            name: round(percentile(ordered, quantile) * 1000, 3)
+            for name, quantile in QUANTILES.items()
+        },
+    }
+
+
+def run_scale(args, scale):
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        command = [
+            sys.executable, '-m', 'benchmarks.bench_load', '--serve',
+            '--project', args.project, '--scale', str(scale),
+            '--concurrency', str(args.concurrency), '--port', str(port),
+            '--database', str(Path(directory) / 'load.sqlite3'),
+        ]
+        if args.settings:
+            command += ['--settings', args.settings]
+        server = subprocess.Popen(
+            command, cwd=BASE_DIR, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            launched = time.perf_counter()
+            targets = json.loads(server.stdout.readline())
+            startup_seconds = time.perf_counter() - launched
+            clients = [
+                LoadClient(port, session) for session in targets['sessions']
+            ]
+            scenario = SCENARIOS[args.project]
+
+            def work(worker):
+                for iteration in range(args.iterations):
+                    scenario(clients[worker], worker, iteration, targets)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                list(pool.map(work, range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            rss = peak_rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+    routes = defaultdict(list)
+    errors = defaultdict(int)
+    for client in clients:
+        for route, samples in client.samples.items():
+            routes[route] += samples
+        for route, count in client.errors.items():
+            errors[route] += count
+    every = [sample for samples in routes.values() for sample in samples]
+    return {
+        'scale': scale,
+        'startup_seconds': round(startup_seconds, 3),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(every) / elapsed, 1),
+        'errors': sum(errors.values()),
+        'latency_ms': summarize(every),
+        'routes': {
+            route: {**summarize(samples), 'errors': errors[route]}
+            for route, samples in sorted(routes.items())
+        },
+        'server_peak_rss_mb': rss,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--project', choices=PROJECTS, default='ya_news')
+    parser.add_argument('--settings')
+    parser.add_argument('--scales', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument(
+        '--iterations', type=int, default=20,
+        help='Сколько раз каждый клиент проходит сценарий.',
+    )
+    parser.add_argument('--output', help='Файл для JSON вместо stdout.')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    report = json.dumps(
+        {
+            'project': args.project,
+            'settings': args.settings or PROJECTS[args.project],
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'concurrency': args.concurrency,
+            'iterations': args.iterations,
+            'results': [run_scale(args, scale) for scale in args.scales],
+        },
+        ensure_ascii=False,
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Накладные расходы MetricsMiddleware на запросы ленты и страницы новости.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_metrics_overhead --requests 200
+"""
+import argparse
+from datetime import date
+
+from benchmarks.utils import setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from news.models import Comment, News
+
+    author = get_user_model().objects.create(username='bench')
+    News.objects.bulk_create(
+        News(title=f'Новость {i}', text='Текст', date=date.today())
+        for i in range(settings.NEWS_COUNT_ON_HOME_PAGE)
+    )
+    news = News.objects.first()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {i}')
+        for i in range(settings.COMMENTS_COUNT_ON_PAGE)
+    )
+    urls = (reverse('news:home'), reverse('news:detail', args=(news.pk,)))
+    without_metrics = [
+        name for name in settings.MIDDLEWARE
+        if name != 'yacommon.metrics.MetricsMiddleware'
+    ]
+    # Клиент собирает цепочку промежуточных слоёв при первом запросе
+    # и дальше её не меняет.
+    clients = {'с метриками': Client()}
+    with override_settings(MIDDLEWARE=without_metrics):
+        clients['без метрик'] = Client()
+        clients['без метрик'].get(urls[0])
+
+    def run(client):
+        for _ in range(args.requests):
+            for url in urls:
+                client.get(url)
+
+    samples = {name: [] for name in clients}
+    for _ in range(args.rounds):
+        for name, client in clients.items():
+            samples[name].append(timed(lambda: run(client), repeat=1))
+    results = {name: min(values) for name, values in samples.items()}
+    requests = args.requests * len(urls)
+    print(f'Запросов за прогон: {requests}')
+    for name, seconds in results.items():
+        print(f'{name:>12}: {seconds / requests * 1000:8.3f} ms/запрос')
+    overhead = results['с метриками'] / results['без метрик'] - 1
+    print(f'накладные расходы: {overhead * 100:.1f} %')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Сравнение OFFSET- и курсорной пагинации ленты новостей.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_news_pagination --pages 10000
+"""
+import argparse
+from datetime import date, timedelta
+
+from benchmarks.utils import setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=10_000)
+    parser.add_argument('--per-page', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from django.core.paginator import Paginator
+
+    from news.models import News
+    from yacommon.pagination import NEXT, CursorPaginator
+
+    total = args.pages * args.per_page
+    today = date.today()
+    News.objects.bulk_create(
+        (
+            News(
+                title=f'Новость {i}',
+                text='Текст',
+                date=today - timedelta(days=i // 5),
+            )
+            for i in range(total)
+        ),
+        batch_size=5000,
+    )
+    queryset = News.objects.all()
+    ordering = ('-date', '-id')
+    cursor_paginator = CursorPaginator(queryset, args.per_page, ordering)
+    offset_paginator = Paginator(
+        queryset.order_by(*ordering), args.per_page
+    )
+    # Курсор на последнюю страницу берём из записи, которая её предваряет.
+    boundary = queryset.order_by(*ordering)[total - args.per_page - 1]
+    last_cursor = cursor_paginator.encode_cursor(boundary, NEXT)
+
+    results = {
+        'offset, page 1': timed(
+            lambda: list(offset_paginator.page(1).object_list)
+        ),
+        f'offset, page {args.pages}': timed(
+            lambda: list(offset_paginator.page(args.pages).object_list)
+        ),
+        'cursor, page 1': timed(lambda: list(cursor_paginator.page())),
+        f'cursor, page {args.pages}': timed(
+            lambda: list(cursor_paginator.page(last_cursor))
+        ),
+    }
+    print(f'Новостей: {total}')
+    for name, seconds in results.items():
+        print(f'{name:>20}: {seconds * 1000:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
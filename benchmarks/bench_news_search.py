@@ -0,0 +1,87 @@
+"""
+Задержка полнотекстового поиска новостей в зависимости от объёма.
+
+Для каждого размера корпус дополняется до нужного числа новостей
+(по --comments комментариев на новость), индекс перестраивается,
+после чего замеряются запросы с частым, редким и префиксным словом.
+Словарь корпуса намеренно мал: частые слова есть в каждом документе,
+это худший случай для ранжирования.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_news_search --sizes 1000 10000 100000
+"""
+import argparse
+import random
+from io import StringIO
+
+from benchmarks.utils import setup_django, timed
+
+VOCABULARY = (
+    'город', 'выборы', 'погода', 'футбол', 'концерт', 'театр', 'мэр',
+    'дорога', 'ремонт', 'школа', 'университет', 'студенты', 'наука',
+    'открытие', 'выставка', 'музей', 'парк', 'транспорт', 'метро',
+    'праздник', 'фестиваль', 'экономика', 'цены', 'рынок', 'спорт',
+)
+QUERIES = {
+    'частое слово': 'город',
+    'редкое слово': 'уникальныйтермин',
+    'префикс': 'фестив',
+    'два слова': 'школа ремонт',
+}
+
+
+def text(rng, words):
+    return ' '.join(rng.choices(VOCABULARY, k=words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10_000, 100_000]
+    )
+    parser.add_argument('--comments', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import Comment, News
+    from news.search import search_news
+
+    rng = random.Random(args.seed)
+    author = get_user_model().objects.create(username='bench')
+    print(f'{"новостей":>10} ' + ' '.join(f'{name:>14}' for name in QUERIES))
+    for size in sorted(args.sizes):
+        missing = size - News.objects.count()
+        News.objects.bulk_create(
+            (News(title=text(rng, 4), text=text(rng, 40))
+             for _ in range(missing)),
+            batch_size=2000,
+        )
+        News.objects.filter(pk=News.objects.order_by('?').first().pk).update(
+            text='уникальныйтермин'
+        )
+        news_ids = list(
+            News.objects.filter(comment_count=0).values_list('pk', flat=True)
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(news_id=news_id, author=author, text=text(rng, 15))
+                for news_id in news_ids for _ in range(args.comments)
+            ),
+            batch_size=2000,
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        latencies = [
+            timed(lambda: search_news(query, 10), repeat=7)
+            for query in QUERIES.values()
+        ]
+        print(f'{size:>10} ' + ' '.join(
+            f'{seconds * 1000:>11.2f} ms' for seconds in latencies
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Круговой прогон import_notes/export_notes на файловой SQLite.
+
+Печатает скорость обеих команд и пиковый RSS процесса: при потоковой
+обработке он не должен расти вместе с числом заметок.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_notes_roundtrip --notes 1000000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import peak_rss_mb, setup_django
+
+
+def write_ndjson(path, count, authors):
+    with open(path, 'w', encoding='utf-8') as file:
+        for index in range(count):
+            file.write(json.dumps({
+                'title': f'Заметка {index % 1000}',
+                'text': 'Текст заметки ' * 10,
+                'author': f'user{index % authors}',
+            }, ensure_ascii=False))
+            file.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100_000)
+    parser.add_argument('--authors', type=int, default=100)
+    parser.add_argument('--chunk-size', type=int, default=900)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        setup_django('ya_note', database=directory / 'bench.sqlite3')
+        from django.core.management import call_command
+
+        source = directory / 'in.ndjson'
+        target = directory / 'out.ndjson'
+        write_ndjson(source, args.notes, args.authors)
+        rss_before = peak_rss_mb()
+        results = {}
+        for name, command, path in (
+            ('import', 'import_notes', source),
+            ('export', 'export_notes', target),
+        ):
+            started = time.perf_counter()
+            call_command(command, str(path), chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - started
+            results[name] = args.notes / elapsed
+        print(f'Заметок: {args.notes}')
+        for name, rate in results.items():
+            print(f'{name:>8}: {rate:10.0f} строк/с')
+        print(f'peak RSS: {peak_rss_mb():.0f} MB '
+              f'(до прогона {rss_before:.0f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Транслитерация заголовков заметок: pytils.slugify против кеша.
+
+Корпус — русские заголовки с распределением Ципфа: немногие
+заголовки («Список покупок», «Идеи») встречаются очень часто.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_slugify --titles 100000
+"""
+import argparse
+import itertools
+import random
+
+from benchmarks.utils import setup_django, timed
+
+WORDS = (
+    'список', 'покупок', 'идеи', 'для', 'проекта', 'встреча', 'с',
+    'командой', 'план', 'на', 'неделю', 'заметки', 'по', 'книге',
+    'рецепт', 'борща', 'отпуск', 'в', 'горах', 'дела', 'домашние',
+    'задание', 'отчёт', 'квартальный', 'подарки', 'друзьям', 'цели',
+    'года', 'тренировка', 'утренняя', 'счета', 'оплатить', 'звонок',
+    'маме', 'черновик', 'письма', 'лекция', 'история', 'музыка',
+    'фильмы', 'посмотреть', 'путешествие', 'Санкт-Петербург', 'ремонт',
+    'кухни', 'машина', 'техосмотр', 'сад', 'огород', 'урожай',
+)
+
+
+def make_titles(count, unique, seed):
+    rng = random.Random(seed)
+    distinct = [
+        ' '.join(rng.choices(WORDS, k=rng.randint(1, 5))).capitalize()
+        for _ in range(unique)
+    ]
+    weights = [1 / rank for rank in range(1, unique + 1)]
+    return rng.choices(distinct, weights=weights, k=count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--unique', type=int, default=5_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_note')
+    from pytils.translit import slugify as pytils_slugify
+
+    from notes.slugs import slugify
+
+    titles = make_titles(args.titles, args.unique, args.seed)
+
+    def run_cached():
+        slugify.cache_clear()
+        for title in titles:
+            slugify(title)
+
+    results = {
+        'pytils': timed(lambda: list(map(pytils_slugify, titles)), 3),
+        'lru_cache': timed(run_cached, 3),
+    }
+    print(f'Заголовков: {len(titles)}, различных: {len(set(titles))}')
+    for name, seconds in results.items():
+        print(f'{name:>10}: {seconds * 1000:9.1f} ms')
+    print(f'   {slugify.cache_info()}')
+    assert all(
+        slugify(title) == pytils_slugify(title)
+        for title in itertools.islice(titles, 1000)
+    )
+
+
+if __name__ == '__main__':
+    main()
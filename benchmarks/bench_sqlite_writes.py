@@ -0,0 +1,107 @@
+"""
+Нагрузочный тест конкурентной записи в SQLite через Django.
+
+Несколько процессов-воркеров одновременно отправляют POST-запросы,
+создающие комментарии (ya_news) или заметки (ya_note), в общую
+файловую базу. Печатает число успешных запросов в секунду и число
+ошибок «database is locked». Сравните настройки проекта по умолчанию
+с боевыми:
+
+    python -m benchmarks.bench_sqlite_writes --project ya_news
+    python -m benchmarks.bench_sqlite_writes --project ya_news \\
+        --settings yanews.settings_production
+"""
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import setup_django
+
+
+def prepare(project):
+    """Создаёт пользователя и возвращает его, адрес и данные POST."""
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    user = get_user_model().objects.create(username='bench')
+    if project == 'ya_news':
+        from news.models import News
+        news = News.objects.create(title='Новость', text='Текст')
+        return user, reverse('news:detail', args=(news.pk,)), {
+            'text': 'Комментарий под нагрузкой',
+        }
+    return user, reverse('notes:add'), {
+        'title': 'Заметка под нагрузкой', 'text': 'Текст',
+    }
+
+
+def run_worker(user, url, data, requests):
+    from django.db import OperationalError, connections
+    from django.test import Client
+
+    connections.close_all()
+    client = Client()
+    client.force_login(user)
+    stats = {'ok': 0, 'locked': 0, 'failed': 0}
+    for _ in range(requests):
+        try:
+            response = client.post(url, data=data)
+        except OperationalError as error:
+            key = 'locked' if 'locked' in str(error) else 'failed'
+            stats[key] += 1
+            continue
+        stats['ok' if response.status_code == 302 else 'failed'] += 1
+    connections.close_all()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--project', choices=('ya_news', 'ya_note'), default='ya_news'
+    )
+    parser.add_argument('--settings')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(
+            args.project,
+            database=Path(directory) / 'bench.sqlite3',
+            settings=args.settings,
+        )
+        from django.conf import settings
+        from django.db import connections
+
+        user, url, data = prepare(args.project)
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        started = time.perf_counter()
+        with context.Pool(args.workers) as pool:
+            results = pool.starmap(
+                run_worker,
+                [(user, url, data, args.requests)] * args.workers,
+            )
+        elapsed = time.perf_counter() - started
+    totals = {
+        key: sum(result[key] for result in results) for key in results[0]
+    }
+    print(json.dumps({
+        'settings': settings.SETTINGS_MODULE,
+        'workers': args.workers,
+        'requests': args.workers * args.requests,
+        'seconds': round(elapsed, 3),
+        'ok_per_second': round(totals['ok'] / elapsed, 1),
+        **totals,
+    }, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
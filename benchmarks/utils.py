@@ -0,0 +1,64 @@
+"""Общие помощники для бенчмарков проектов ya_news и ya_note."""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROJECTS = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def configure_django(project, settings=None):
+    """
+    Настраивает Django для проекта, не трогая базу данных.
+
+    settings — модуль настроек вместо настроек проекта по умолчанию.
+    """
+    sys.path.insert(0, str(BASE_DIR / project))
+    if settings is not None:
+        os.environ['DJANGO_SETTINGS_MODULE'] = settings
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', PROJECTS[project])
+    import django
+    django.setup()
+
+
+def setup_django(project, database=None, settings=None, **overrides):
+    """
+    Настраивает Django для проекта и создаёт чистую тестовую базу.
+
+    По умолчанию используется тестовая SQLite в памяти; database —
+    путь к файлу, если данные не должны занимать память процесса.
+    overrides — значения настроек поверх модуля настроек; применяются
+    до первого импорта URLconf. Рабочая db.sqlite3 не затрагивается.
+    """
+    configure_django(project, settings)
+    from django.conf import settings as django_settings
+    for name, value in overrides.items():
+        setattr(django_settings, name, value)
+    from django.db import connection
+    if database is not None:
+        connection.settings_dict['TEST']['NAME'] = str(database)
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def timed(func, repeat=5):
+    """Медианное время выполнения func в секундах."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def peak_rss_mb():
+    """Пиковый RSS текущего процесса в мегабайтах (Linux)."""
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -14,6 +14,51 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+NEWS_FAILED=" При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта "
+NOTE_FAILED=" При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта "
+
+run_fast () {
+    # Run both projects' suites at the same time, each sharded over half of the
+    # CPU cores by pytest-xdist (on a single core tests run in-process).
+    # Test databases are kept in TEST_DB_DIR and reused by the next run.
+    # Extra arguments are passed to both pytest runs, e.g. --create-db.
+    local db_dir="${TEST_DB_DIR:-$PWD/.test_databases}"
+    local workers="${TEST_WORKERS:-$(python -c 'import os; print((os.cpu_count() or 2) // 2)')}"
+    local news_log=$(mktemp)
+    local note_log=$(mktemp)
+    mkdir -p "$db_dir"
+    (
+        cd ya_news
+        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
+        export DJANGO_TEST_DB_NAME="$db_dir/yanews.sqlite3"
+        pytest --tb=line --reuse-db --numprocesses="$workers" "$@" >"$news_log" 2>&1
+    ) &
+    local news_pid=$!
+    (
+        cd ya_note
+        export DJANGO_SETTINGS_MODULE="yanote.settings"
+        export DJANGO_TEST_DB_NAME="$db_dir/yanote.sqlite3"
+        pytest --tb=line --reuse-db --numprocesses="$workers" "$@" >"$note_log" 2>&1
+    ) &
+    local note_pid=$!
+    wait $news_pid
+    local news_status=$?
+    wait $note_pid
+    local note_status=$?
+    cat "$news_log" "$note_log" 1>&2
+    rm -f "$news_log" "$note_log"
+    if [[ $news_status -ne 0 ]]; then
+        print_message "$NEWS_FAILED" "=" 1
+        echo \`\`\` 1>&2
+    fi
+    if [[ $note_status -ne 0 ]]; then
+        print_message "$NOTE_FAILED" "=" 1
+        echo \`\`\` 1>&2
+    fi
+    if [[ $news_status -ne 0 ]]; then return $news_status; fi
+    return $note_status
+}
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,6 +66,12 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        if [[ "$1" == "--fast" ]]
+        then
+            shift
+            run_fast "$@"
+            exit $?
+        fi
         cd ya_news
         export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
         if pytest --tb=line 1>&2;
@@ -33,13 +84,13 @@ then
                 exit 0
             else
                 status=$?
-                print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
+                print_message "$NOTE_FAILED" "=" 1
                 echo \`\`\` 1>&2
                 exit $status
             fi
         else
             status=$?
-            print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
+            print_message "$NEWS_FAILED" "=" 1
             echo \`\`\` 1>&2
             exit $status
         fi
@@ -1,15 +1,91 @@
 from django.contrib import admin
+from django.db.models import Sum
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import Comment, News
+from yacommon.admin import CursorPaginatedAdmin
+
+from .models import BadWord, Comment, News
+from .search import filter_news
+
+NEWS_LOOKUP = 'news__id__exact'
+# Сколько последних комментариев показывать на странице новости.
+RECENT_COMMENTS = 20
+
+
+@admin.register(Comment)
+class CommentAdmin(CursorPaginatedAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+
+    def estimate_count(self, changelist):
+        """Комментарии всех новостей или одной считаются по счётчикам."""
+        lookups = changelist.get_filters_params()
+        if changelist.query or not set(lookups) <= {NEWS_LOOKUP}:
+            return super().estimate_count(changelist)
+        news = News.objects.all()
+        if lookups:
+            news = news.filter(pk=lookups[NEWS_LOOKUP])
+        total = news.aggregate(total=Sum('comment_count'))['total']
+        return total or 0, False
+
+
+class RecentCommentsFormSet(BaseInlineFormSet):
+    """Только последние комментарии новости, а не вся ветка."""
+
+    def get_queryset(self):
+        if not hasattr(self, '_recent_queryset'):
+            queryset = super().get_queryset()
+            recent = queryset.order_by('-created', '-id').values('pk')
+            self._recent_queryset = queryset.filter(
+                pk__in=recent[:RECENT_COMMENTS]
+            )
+        return self._recent_queryset
 
 
 class CommentInline(admin.StackedInline):
     model = Comment
+    formset = RecentCommentsFormSet
     extra = 0
+    raw_id_fields = ('author',)
 
 
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(CursorPaginatedAdmin):
     inlines = [
         CommentInline,
     ]
+    readonly_fields = ('all_comments',)
+    list_display = ('title', 'date', 'comment_count')
+    # Фильтр по дате и порядок списка идут по индексу news_date_id_idx.
+    list_filter = ('date',)
+    cursor_ordering = ('-date', '-id')
+    search_fields = ('title', 'text')
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по индексу FTS5 вместо LIKE по всей таблице."""
+        found = filter_news(queryset, search_term)
+        if found is None:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return found, False
+
+    @admin.display(description='Комментарии')
+    def all_comments(self, news):
+        if news.pk is None:
+            return '—'
+        url = reverse('admin:news_comment_changelist')
+        return format_html(
+            'Последние {} из {}: <a href="{}?{}={}">все комментарии</a>',
+            min(news.comment_count, RECENT_COMMENTS),
+            news.comment_count,
+            url,
+            NEWS_LOOKUP,
+            news.pk,
+        )
+
+
+admin.site.register(BadWord)
@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from yacommon.metrics import track_queries, track_render
+
+# Django 3.2 не умеет асинхронно обращаться к ORM, а sync_to_async()
+# выполняет весь синхронный код запросов в одном общем потоке. Свой пул
+# не упирается в этот поток, а его размер ограничивает число
+# одновременных обращений к базе.
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.NEWS_ASYNC_THREADS,
+    thread_name_prefix='news-async',
+)
+
+
+def _respond(view, request, kwargs):
+    with track_queries():
+        try:
+            response = view(request, **kwargs)
+            # Шаблон тоже читает базу (пользователь, сессия), поэтому
+            # отрисовывается здесь же, а не в потоке обработчика.
+            if callable(getattr(response, 'render', None)):
+                track_render(response)
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+
+async def run_view(view, request, **kwargs):
+    """Выполняет синхронное представление в пуле EXECUTOR."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        EXECUTOR, context.run, _respond, view, request, kwargs
+    )
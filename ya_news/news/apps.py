@@ -5,3 +5,13 @@ class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from yacommon.db import apply_sqlite_pragmas
+        from yacommon.warmup import warm_up_if_enabled
+
+        from . import signals  # noqa: F401
+        connection_created.connect(apply_sqlite_pragmas)
+        warm_up_if_enabled()
@@ -0,0 +1,89 @@
+import threading
+import time
+from pathlib import Path
+
+from django.db.models import Count, Max
+
+from .matching import BadWordMatcher
+from .models import BadWord
+
+
+class BadWordsDictionary:
+    """
+    Словарь запрещённых слов с горячей перезагрузкой.
+
+    Слова собираются из defaults, файла path (по слову в строке,
+    строки с # пропускаются) и таблицы BadWord. Не чаще раза в
+    check_interval секунд сверяется версия источников: mtime файла
+    и отпечаток таблицы (число строк и последнее изменение). Если
+    версия поменялась, новый автомат строится целиком в стороне и
+    подменяется одним присваиванием, поэтому запросы в работе никогда
+    не видят недостроенную структуру. Перестраивает автомат один
+    поток процесса, остальные пока пользуются прежним.
+    """
+
+    def __init__(self, defaults=(), path=None, check_interval=5.0):
+        self.defaults = tuple(defaults)
+        self.path = Path(path) if path else None
+        self.check_interval = check_interval
+        self._matcher = None
+        self._version = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def matcher(self):
+        """Актуальный автомат; при необходимости перезагружает словарь."""
+        if self._matcher is None or time.monotonic() >= self._next_check:
+            self.reload(force=False)
+        return self._matcher
+
+    def matches(self, text):
+        return self.matcher.matches(text)
+
+    def _file_version(self):
+        if self.path is None:
+            return None
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _db_version(self):
+        version = BadWord.objects.aggregate(
+            total=Count('pk'), updated=Max('updated')
+        )
+        return version['total'], version['updated']
+
+    def _load_words(self):
+        words = list(self.defaults)
+        if self._file_version() is not None:
+            with open(self.path, encoding='utf-8') as file:
+                words.extend(
+                    line.strip() for line in file
+                    if line.strip() and not line.lstrip().startswith('#')
+                )
+        words.extend(BadWord.objects.values_list('word', flat=True))
+        return words
+
+    def reload(self, force=True):
+        """
+        Перестраивает автомат, если изменились источники.
+
+        force=True пропускает проверку версии и интервала.
+        """
+        # Ждём только при самой первой загрузке: без автомата
+        # отвечать нечем, а дальше хватит и прежнего.
+        if not self._lock.acquire(blocking=self._matcher is None):
+            return
+        try:
+            if not force and self._matcher is not None:
+                if time.monotonic() < self._next_check:
+                    return
+            self._next_check = time.monotonic() + self.check_interval
+            version = (self._file_version(), self._db_version())
+            if force or version != self._version:
+                self._matcher = BadWordMatcher(self._load_words())
+                self._version = version
+        finally:
+            self._lock.release()
@@ -0,0 +1,19 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+NEWS_ITEM_FRAGMENT = 'news_item'
+
+
+def news_item_key(news_id):
+    """Ключ фрагмента новости на главной, см. news/home.html."""
+    return make_template_fragment_key(NEWS_ITEM_FRAGMENT, [news_id])
+
+
+def evict_news_items(news_ids):
+    """
+    Удаляет из кеша фрагменты перечисленных новостей.
+
+    Ключи известны заранее, поэтому поиск по шаблону не нужен и
+    инвалидация работает с любым бэкендом, включая locmem и файловый.
+    """
+    cache.delete_many([news_item_key(news_id) for news_id in news_ids])
@@ -0,0 +1,91 @@
+from functools import wraps
+from hashlib import md5
+
+from django.db.models import Count, Max, Subquery, Sum
+from django.views.decorators.http import condition
+
+from .models import Comment, News
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def news_state(news_id=None):
+    """
+    Всё, от чего зависят данные ленты или страницы новости, одним запросом.
+
+    Дата последней новости, число новостей и комментариев к ним и время
+    последней правки новости и комментария. Комментарии считаются по
+    News.comment_count, а последняя правка комментария берётся по
+    индексу comment_updated_idx, так что таблица комментариев не
+    сканируется.
+
+    Ограничение: для ленты (news_id=None) Count, Sum и Max('updated')
+    проходят по всей news_news на каждый условный GET, и стоимость
+    растёт линейно с числом новостей. Если этот запрос станет дороже
+    отрисовки ленты, состояние нужно хранить отдельной строкой
+    «последнее изменение». Обновлять её одними сигналами нельзя:
+    bulk_create(), update() и insert_rows() их не посылают.
+    """
+    news = News.objects.order_by()
+    comments = Comment.objects.order_by('-updated')
+    if news_id is not None:
+        news = news.filter(pk=news_id)
+        comments = comments.filter(news=news_id)
+    return news.aggregate(
+        last_date=Max('date'),
+        news_count=Count('pk'),
+        comment_count=Sum('comment_count'),
+        last_news=Max('updated'),
+        # Некоррелированный подзапрос база вычисляет один раз.
+        last_comment=Max(Subquery(comments.values('updated')[:1])),
+    )
+
+
+def _state(request, pk=None):
+    """news_state() для запроса: ETag и Last-Modified делят один запрос."""
+    if not hasattr(request, '_news_state'):
+        request._news_state = news_state(pk)
+    return request._news_state
+
+
+def news_etag(request, pk=None):
+    """
+    ETag страницы: состояние данных, адрес с курсором и пользователь.
+
+    Шапка, форма комментария и ссылки на правку у каждого
+    пользователя свои, поэтому пользователь входит в ETag.
+    """
+    state = _state(request, pk)
+    user = request.user
+    parts = (
+        user.pk if user.is_authenticated else '',
+        request.get_full_path(),
+        *(state[key] for key in sorted(state)),
+    )
+    return md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def news_last_modified(request, pk=None):
+    state = _state(request, pk)
+    moments = (state['last_news'], state['last_comment'])
+    return max(filter(None, moments), default=None)
+
+
+def conditional_news_page(view):
+    """
+    Отвечает 304 Not Modified на GET и HEAD, если страница не менялась.
+
+    Шаблон при этом не отрисовывается. Остальные методы, например
+    отправка комментария, идут в представление без лишнего запроса.
+    """
+    conditional_view = condition(
+        etag_func=news_etag, last_modified_func=news_last_modified
+    )(view)
+
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return conditional_view(request, *args, **kwargs)
+        return view(request, *args, **kwargs)
+
+    return inner
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Таймаут {% cache %} для фрагментов новостей и шапки сайта."""
+    return {'fragment_cache_timeout': settings.NEWS_CACHE_TIMEOUT}
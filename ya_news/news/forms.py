@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
+from .bad_words import BadWordsDictionary
 from .models import Comment
 
 BAD_WORDS = (
@@ -10,6 +12,12 @@ BAD_WORDS = (
 )
 WARNING = 'Не ругайтесь!'
 
+BAD_WORDS_DICTIONARY = BadWordsDictionary(
+    BAD_WORDS,
+    path=settings.BAD_WORDS_FILE,
+    check_interval=settings.BAD_WORDS_CHECK_INTERVAL,
+)
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -19,8 +27,9 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        self.bad_words = BAD_WORDS_DICTIONARY.matches(text)
+        if self.bad_words:
+            raise ValidationError(
+                WARNING, code='bad_words', params={'words': self.bad_words}
+            )
         return text
@@ -0,0 +1,180 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from news.models import Comment, News
+from news.search import index_missing_news, index_new_comments
+from news.synthetic import SENTENCES, news_title
+from yacommon.db import insert_rows
+from yacommon.synthetic import (bulk_load, chunked, create_users, text,
+                                zipf_counts)
+
+NEWS_FIELDS = ('title', 'text', 'date', 'updated', 'comment_count')
+COMMENT_FIELDS = ('news', 'author', 'text', 'created', 'updated')
+TEXT_POOL_SIZE = 1000
+
+
+def to_utc(value):
+    """
+    Наивное время в UTC, как его хранит база при USE_TZ.
+
+    Наивное значение считается местным. Готовые наивные даты
+    адаптер базы не переводит, а перевод каждой даты через
+    часовой пояс на миллионах строк заметно дорог.
+    """
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.make_naive(value, timezone.utc)
+
+
+def inserted_ids(queryset, after_id):
+    """
+    id строк, вставленных после строки after_id, по порядку вставки.
+
+    SQLite не возвращает id из bulk_create(), а при единственном
+    пишущем процессе новые строки получают id подряд.
+    """
+    return list(
+        queryset.filter(pk__gt=after_id).order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, новости и комментарии к ним для '
+        'нагрузочных экспериментов. Число комментариев у новостей '
+        'распределено по закону Ципфа; при одинаковых --seed и '
+        '--until данные совпадают. Новости и комментарии вставляются '
+        'executemany() без объектов моделей и сигналов, счётчики '
+        'комментариев задаются сразу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument(
+            '--comments', type=int, default=10_000,
+            help='Сколько комментариев всего.',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель закона Ципфа; 0 — поровну на каждую новость.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до --until разбросаны новости.',
+        )
+        parser.add_argument(
+            '--until', type=datetime.fromisoformat,
+            default=timezone.localdate().isoformat(),
+            help='Дата последней новости, ГГГГ-ММ-ДД; по умолчанию сегодня.',
+        )
+        parser.add_argument('--username-prefix', default='user')
+        parser.add_argument(
+            '--batch-size', type=int, default=20_000,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--no-index', action='store_true',
+            help='Не добавлять новые строки в поисковый индекс.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.until = timezone.make_aware(options['until'])
+        started = time.perf_counter()
+        users = create_users(options['users'], options['username_prefix'])
+        counts = zipf_counts(
+            options['comments'], options['news'], options['zipf'], self.rng
+        )
+        comments = 0
+        rebuild, indexes = bulk_load(Comment, options['comments'])
+        self.index = not options['no_index'] and not rebuild
+        with indexes:
+            for chunk in chunked(counts, self.batch_size):
+                news = self.create_news(chunk, options['days'])
+                comments += self.create_comments(news, users)
+                if options['verbosity'] > 1:
+                    self.stderr.write(f'... {comments}')
+        if rebuild and not options['no_index']:
+            call_command(
+                'rebuild_search_index',
+                stdout=self.stdout,
+                verbosity=options['verbosity'],
+            )
+        elapsed = time.perf_counter() - started
+        total = len(users) + len(counts) + comments
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(users)}, новостей: {len(counts)}, '
+            f'комментариев: {comments} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def create_news(self, counts, days):
+        """Новости с заданными счётчиками; (id, время, комментарии)."""
+        max_length = News._meta.get_field('title').max_length
+        dates = [
+            (self.until - timedelta(days=self.rng.randrange(days + 1))).date()
+            for _ in counts
+        ]
+        published = [
+            to_utc(datetime.combine(date, datetime.min.time()))
+            for date in dates
+        ]
+        rows = [
+            (
+                news_title(self.rng, max_length),
+                text(self.rng, SENTENCES, 5),
+                connection.ops.adapt_datefield_value(date),
+                connection.ops.adapt_datetimefield_value(moment),
+                count,
+            )
+            for date, moment, count in zip(dates, published, counts)
+        ]
+        with transaction.atomic():
+            last_id = News.objects.aggregate(last=Max('pk'))['last'] or 0
+            insert_rows(News, NEWS_FIELDS, rows)
+            ids = inserted_ids(News.objects.all(), last_id)
+            if self.index:
+                index_missing_news(last_id)
+        return list(zip(ids, published, counts))
+
+    def comments(self, news, users):
+        """Строки комментариев для insert_rows(), время — наивное UTC."""
+        rng = self.rng
+        adapt = connection.ops.adapt_datetimefield_value
+        until = to_utc(self.until + timedelta(days=1))
+        # Собирать текст на каждый комментарий втрое дольше вставки.
+        texts = [text(rng, SENTENCES) for _ in range(TEXT_POOL_SIZE)]
+        for news_id, published, count in news:
+            # Комментарии появляются от публикации до конца дня --until.
+            seconds = (until - published).total_seconds()
+            for _ in range(count):
+                created = adapt(
+                    published + timedelta(seconds=rng.random() * seconds)
+                )
+                yield (
+                    news_id, rng.choice(users), rng.choice(texts),
+                    created, created,
+                )
+
+    def create_comments(self, news, users):
+        created = 0
+        last_id = Comment.objects.aggregate(last=Max('pk'))['last'] or 0
+        for chunk in chunked(self.comments(news, users), self.batch_size):
+            with transaction.atomic():
+                insert_rows(Comment, COMMENT_FIELDS, chunk)
+            created += len(chunk)
+        if self.index:
+            with transaction.atomic():
+                index_new_comments(last_id)
+        return created
@@ -0,0 +1,271 @@
+import json
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import partial
+from itertools import chain
+
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from news.models import Comment, News
+from news.search import index_missing_news
+from yacommon.db import keep_timestamps
+
+# Порядок вставки внутри транзакции: комментарии ссылаются на новости.
+MODELS = (News, Comment)
+READ_SIZE = 1 << 16
+# Самый длинный элемент JSON-массива, символов.
+MAX_ITEM_SIZE = 16 << 20
+WHITESPACE = re.compile(r'\s*')
+# Состояния разбора JSON-массива и переходы по знакам препинания.
+START, FIRST, ITEM, AFTER_ITEM, END = range(5)
+TRANSITIONS = {
+    (START, '['): FIRST,
+    (FIRST, ']'): END,
+    (AFTER_ITEM, ','): ITEM,
+    (AFTER_ITEM, ']'): END,
+}
+
+
+def iter_json_array(chunks, max_item_size=MAX_ITEM_SIZE):
+    """
+    Элементы JSON-массива по одному, без чтения файла целиком.
+
+    chunks — куски текста. Элемент разбирается, когда дочитан
+    до конца, поэтому в памяти держится не больше одного элемента
+    и одного куска. Недочитанный элемент разбирается заново, только
+    когда он вырос вдвое, а элемент длиннее max_item_size символов
+    считается ошибкой: битая запись не заставит читать в память весь
+    остаток файла.
+    """
+    decoder = json.JSONDecoder()
+    buffer, state = '', START
+    # Сколько байт файла уже отброшено из начала buffer.
+    offset = 0
+    retry_at = 0
+    # Пустой кусок в конце заставляет разобрать всё, что осталось.
+    for chunk in chain(chunks, ['']):
+        buffer += chunk
+        if chunk and len(buffer) < retry_at:
+            continue
+        state, position, retry_at = yield from _parse(
+            decoder, buffer, state, offset
+        )
+        if state == END:
+            return
+        offset += len(buffer[:position].encode())
+        buffer = buffer[position:]
+        if len(buffer) > max_item_size:
+            raise ValueError(
+                f'Элемент с байта {offset} длиннее {max_item_size} '
+                'символов: запись повреждена или не закрыта.'
+            )
+        retry_at = min(retry_at, max_item_size + 1)
+    if buffer.strip():
+        # Покажет настоящую ошибку в недочитанном элементе.
+        try:
+            decoder.raw_decode(buffer, WHITESPACE.match(buffer).end())
+        except ValueError as error:
+            raise ValueError(f'Элемент с байта {offset}: {error}')
+    raise ValueError('Файл закончился посреди JSON-массива.')
+
+
+def _parse(decoder, buffer, state, offset):
+    """
+    Разбирает buffer, отдавая готовые элементы.
+
+    Возвращает новое состояние, позицию, с которой начинается
+    недочитанная часть, и длину buffer, до которой не стоит пробовать
+    разбирать её снова.
+    """
+    position = 0
+    while state != END:
+        position = WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            break
+        char = buffer[position]
+        if state in (FIRST, ITEM) and (state, char) not in TRANSITIONS:
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # Элемент не дочитан: ждём, пока он вырастет вдвое.
+                return state, position, 2 * (len(buffer) - position)
+            state = AFTER_ITEM
+            yield item
+            continue
+        if (state, char) not in TRANSITIONS:
+            byte = offset + len(buffer[:position].encode())
+            raise ValueError(
+                f'Неожиданный символ {char!r} в JSON на байте {byte}.'
+            )
+        state, position = TRANSITIONS[state, char], position + 1
+    return state, position, 0
+
+
+def iter_ndjson(chunks):
+    """Объекты NDJSON: по одному JSON на строку."""
+    buffer, number = '', 0
+    for chunk in chain(chunks, ['\n']):
+        *lines, buffer = (buffer + chunk).split('\n')
+        for line in lines:
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise ValueError(f'Строка {number}: {error}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает новости и комментарии из JSON в формате '
+        'фикстур (как news/fixtures/news.json) или из NDJSON с теми же '
+        'объектами: файл читается потоком, строки вставляются '
+        'bulk_create() транзакциями заданного размера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл с объектами; по умолчанию stdin.',
+        )
+        parser.add_argument(
+            '--format', choices=('auto', 'json', 'ndjson'), default='auto',
+            help='По умолчанию определяется по первому символу файла.',
+        )
+        parser.add_argument(
+            '--transaction-size', type=int, default=10_000,
+            help='Сколько объектов вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Размер одного INSERT; по умолчанию его выбирает Django.',
+        )
+        parser.add_argument(
+            '--no-constraints', action='store_true',
+            help='Не проверять внешние ключи при вставке, '
+                 'а проверить один раз в конце.',
+        )
+        parser.add_argument(
+            '--no-signals', action='store_true',
+            help='Не обновлять счётчики комментариев, поисковый индекс '
+                 'и кеш по ходу загрузки, а пересчитать их в конце.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        self.deferred = options['no_signals']
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            if options['path'] == '-':
+                file = sys.stdin
+            else:
+                file = stack.enter_context(
+                    open(options['path'], encoding='utf-8')
+                )
+            if options['no_constraints']:
+                stack.enter_context(connection.constraint_checks_disabled())
+            for model in MODELS:
+                stack.enter_context(keep_timestamps(model))
+            try:
+                counts = self.load(
+                    self.records(file, options['format']),
+                    options['transaction_size'],
+                )
+            except (ValueError, DeserializationError) as error:
+                raise CommandError(error)
+            if options['no_constraints']:
+                connection.check_constraints(
+                    table_names=[model._meta.db_table for model in MODELS]
+                )
+        if self.deferred:
+            self.rebuild_related()
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено новостей: {counts[News]}, '
+            f'комментариев: {counts[Comment]} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} объектов/с)'
+        ))
+
+    def records(self, file, file_format):
+        chunks = iter(partial(file.read, READ_SIZE), '')
+        if file_format == 'auto':
+            first = next(chunks, '')
+            is_array = first.lstrip().startswith('[')
+            file_format = 'json' if is_array else 'ndjson'
+            chunks = chain([first], chunks)
+        if file_format == 'json':
+            return iter_json_array(chunks)
+        return iter_ndjson(chunks)
+
+    def load(self, records, transaction_size):
+        counts = Counter()
+        pending = {model: [] for model in MODELS}
+        objects = serializers.deserialize(
+            'python', records, ignorenonexistent=True
+        )
+        for number, deserialized in enumerate(objects, start=1):
+            obj = deserialized.object
+            if type(obj) not in pending:
+                raise CommandError(
+                    f'Объект {number}: модель {obj._meta.label} '
+                    'не поддерживается.'
+                )
+            pending[type(obj)].append(obj)
+            if number % transaction_size == 0:
+                self.flush(pending, counts)
+        self.flush(pending, counts)
+        return counts
+
+    def flush(self, pending, counts):
+        news, comments = pending[News], pending[Comment]
+        if not news and not comments:
+            return
+        now = timezone.now()
+        for item in news:
+            # Счётчики пересчитываются по загруженным комментариям.
+            item.comment_count = 0
+            item.updated = item.updated or now
+        for comment in comments:
+            comment.created = comment.created or now
+            comment.updated = comment.updated or comment.created
+        with transaction.atomic():
+            last_id = News.objects.aggregate(last=Max('pk'))['last'] or 0
+            News.objects.bulk_create(news, batch_size=self.batch_size)
+            Comment.objects.bulk_create(
+                comments,
+                batch_size=self.batch_size,
+                update_related=not self.deferred,
+            )
+            if not self.deferred:
+                index_missing_news(
+                    last_id,
+                    [item.pk for item in news if item.pk is not None],
+                )
+        counts[News] += len(news)
+        counts[Comment] += len(comments)
+        news.clear()
+        comments.clear()
+        if self.verbosity > 1:
+            self.stderr.write(f'... {sum(counts.values())}')
+
+    def rebuild_related(self):
+        """Счётчики, индекс и кеш, которые не обновлялись при загрузке."""
+        updated = News.objects.recount_comments()
+        self.stdout.write(f'Пересчитано счётчиков: {updated}')
+        call_command(
+            'rebuild_search_index',
+            stdout=self.stdout,
+            verbosity=self.verbosity,
+        )
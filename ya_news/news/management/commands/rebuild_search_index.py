@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from news.search import FTS_TABLE, comment_rowid, fts_available, news_rowid
+
+SOURCES = (
+    ('новостей', 'news_news', 'id * 2, id, title, text', news_rowid),
+    (
+        'комментариев', 'news_comment', "id * 2 + 1, news_id, '', text",
+        comment_rowid,
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс новостей и комментариев. Индекс '
+        'переписывается диапазонами id, поэтому поиск работает всё время '
+        'перестройки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        with connection.cursor() as cursor:
+            for name, table, columns, rowid in SOURCES:
+                indexed = self.copy(
+                    cursor, table, columns, rowid, options['chunk_size']
+                )
+                self.stdout.write(f'Проиндексировано {name}: {indexed}')
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+            )
+        self.stdout.write(self.style.SUCCESS('Индекс перестроен.'))
+
+    def copy(self, cursor, table, columns, rowid, chunk_size):
+        """
+        Переписывает строки индекса диапазонами id, по транзакции
+        на диапазон: старые строки диапазона удаляются и вставляются
+        заново, остальной индекс в это время доступен поиску.
+        """
+        indexed, last_id = 0, 0
+        while True:
+            with transaction.atomic():
+                cursor.execute(
+                    'SELECT max(id) FROM ('
+                    f'SELECT id FROM {table} WHERE id > %s '
+                    'ORDER BY id LIMIT %s)',
+                    [last_id, chunk_size],
+                )
+                next_id = cursor.fetchone()[0]
+                # Строки удалённых объектов за последним id тоже уходят.
+                self.delete(cursor, rowid, last_id, next_id)
+                if next_id is None:
+                    return indexed
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, news_id, title, body) '
+                    f'SELECT {columns} FROM {table} '
+                    'WHERE id > %s AND id <= %s',
+                    [last_id, next_id],
+                )
+                indexed += cursor.rowcount
+                last_id = next_id
+
+    def delete(self, cursor, rowid, last_id, next_id):
+        """Удаляет строки источника rowid с id в (last_id, next_id]."""
+        # Новости и комментарии чередуют rowid по чётности.
+        sql = (
+            f'DELETE FROM {FTS_TABLE} WHERE rowid > %s '
+            f'AND rowid %% 2 = {rowid(0) % 2}'
+        )
+        params = [rowid(last_id)]
+        if next_id is not None:
+            sql += ' AND rowid <= %s'
+            params.append(rowid(next_id))
+        cursor.execute(sql, params)
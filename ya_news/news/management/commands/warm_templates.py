@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from yacommon.warmup import warm_up_templates
+
+
+class Command(BaseCommand):
+    help = 'Компилирует все шаблоны и выводит время компиляции каждого.'
+
+    def handle(self, *args, **options):
+        timings = warm_up_templates()
+        for name, seconds in sorted(
+            timings.items(), key=lambda item: item[1], reverse=True
+        ):
+            self.stdout.write(f'{seconds * 1000:8.2f} мс  {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {len(timings)} '
+            f'за {sum(timings.values()) * 1000:.2f} мс'
+        ))
@@ -0,0 +1,145 @@
+from collections import deque, namedtuple
+
+SUBSTRING = 'substring'
+WORD = 'word'
+STEM = 'stem'
+
+# Окончания русских слов, от длинных к коротким.
+ENDINGS = sorted(
+    (
+        'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+        'ой', 'ей', 'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ом', 'ем', 'ам',
+        'ям', 'ах', 'ях', 'ов', 'ев', 'ую', 'юю',
+        'ы', 'и', 'а', 'я', 'о', 'е', 'у', 'ю', 'ь', 'й',
+    ),
+    key=len,
+    reverse=True,
+)
+ENDINGS_SET = frozenset(ENDINGS) | {''}
+MIN_STEM_LENGTH = 4
+MAX_ENDING_LENGTH = max(map(len, ENDINGS))
+
+Match = namedtuple('Match', ('term', 'start', 'end'))
+
+
+def normalize(text):
+    """Приводит текст к виду, в котором ищутся шаблоны."""
+    return text.lower().replace('ё', 'е')
+
+
+def stem(word):
+    """Отрезает окончание, оставляя основу не короче MIN_STEM_LENGTH."""
+    for ending in ENDINGS:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return word[:-len(ending)]
+    return word
+
+
+def _is_word_char(text, index):
+    return 0 <= index < len(text) and text[index].isalnum()
+
+
+class BadWordMatcher:
+    """
+    Автомат Ахо — Корасик для поиска запрещённых слов.
+
+    Автомат строится один раз, после чего текст любой длины
+    проверяется за один проход независимо от размера словаря.
+    Режимы:
+      SUBSTRING — слово встречается в тексте как подстрока;
+      WORD — слово стоит в тексте целиком;
+      STEM — всё, что находит SUBSTRING, и вдобавок основа слова
+        в начале слова текста, за которой до конца слова идёт одно
+        из окончаний ENDINGS (ловит «суперредиска», «редиски»,
+        «негодяем», но не «редисковый»).
+    """
+
+    def __init__(self, terms, mode=STEM):
+        self.mode = mode
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for term in terms:
+            self._add(term)
+        self._build()
+
+    def _patterns(self, term):
+        """Шаблоны слова term и режим, в котором проверяется каждый."""
+        pattern = normalize(term)
+        if self.mode != STEM:
+            return [(pattern, self.mode)]
+        # Подстрока целиком — как в простой проверке, основа — сверх неё.
+        patterns = [(pattern, SUBSTRING)]
+        if stem(pattern) != pattern:
+            patterns.append((stem(pattern), STEM))
+        return patterns
+
+    def _add(self, term):
+        for pattern, mode in self._patterns(term):
+            if pattern:
+                self._insert(pattern, term, mode)
+
+    def _insert(self, pattern, term, mode):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += ((term, len(pattern), mode),)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += (
+                    self._output[self._fail[next_state]]
+                )
+
+    @staticmethod
+    def _match_end(text, start, end, mode):
+        """Конец совпадения с учётом режима или None, если оно не годится."""
+        if mode == SUBSTRING:
+            return end
+        if _is_word_char(text, start - 1):
+            return None
+        if mode == WORD:
+            return None if _is_word_char(text, end) else end
+        word_end = end
+        while _is_word_char(text, word_end):
+            word_end += 1
+            if word_end - end > MAX_ENDING_LENGTH:
+                return None
+        return word_end if text[end:word_end] in ENDINGS_SET else None
+
+    def finditer(self, text):
+        """Перебирает совпадения в порядке их окончания в тексте."""
+        text = normalize(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term, length, mode in output[state]:
+                start = index - length + 1
+                end = self._match_end(text, start, index + 1, mode)
+                if end is not None:
+                    yield Match(term, start, end)
+
+    def matches(self, text):
+        """Список найденных слов словаря без повторов."""
+        return list(dict.fromkeys(match.term for match in self.finditer(text)))
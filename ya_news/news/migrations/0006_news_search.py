@@ -0,0 +1,38 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS news_search USING fts5('
+    'news_id UNINDEXED, title, body, '
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+FILL_SQL = (
+    'INSERT INTO news_search (rowid, news_id, title, body) '
+    'SELECT id * 2, id, title, text FROM news_news '
+    'UNION ALL '
+    "SELECT id * 2 + 1, news_id, '', text FROM news_comment"
+)
+DROP_SQL = 'DROP TABLE IF EXISTS news_search'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_badword'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
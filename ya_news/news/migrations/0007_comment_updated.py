@@ -0,0 +1,29 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created(apps, schema_editor):
+    """Старые комментарии считаются не правленными с момента создания."""
+    apps.get_model('news', 'Comment').objects.update(updated=F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_news_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_created, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['updated'], name='comment_updated_idx'),
+        ),
+    ]
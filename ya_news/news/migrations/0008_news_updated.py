@@ -0,0 +1,22 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_comment_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['updated'], name='news_updated_idx'),
+        ),
+    ]
@@ -1,22 +1,163 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from yacommon.db import SQL_PARAMS_LIMIT
+
+from .cache import evict_news_items
+
+# Пока установлен, удалённый комментарий не сдвигает счётчик своей
+# новости и не убирается из индекса по одному: удаляется сама новость
+# или комментарии удаляются QuerySet.delete(), который делает это
+# для всех сразу.
+BULK_COMMENT_DELETION = ContextVar('bulk_comment_deletion', default=False)
+
+
+@contextmanager
+def bulk_comment_deletion(comments):
+    """Убирает comments из индекса одним запросом и удаляет их оптом."""
+    from .search import unindex_comments
+
+    token = BULK_COMMENT_DELETION.set(True)
+    try:
+        with transaction.atomic(using=comments.db):
+            unindex_comments(comments)
+            yield
+    finally:
+        BULK_COMMENT_DELETION.reset(token)
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def recount_comments(self, batch_size=1000):
+        """
+        Пересчитывает счётчик комментариев по таблице комментариев.
+
+        Правятся и вытесняются из кеша только новости, у которых счётчик
+        разошёлся с таблицей, пачками по batch_size. Возвращает их число.
+        """
+        comments = (
+            Comment.objects.filter(news=OuterRef('pk'))
+            .order_by()
+            .values('news')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        actual = Coalesce(Subquery(comments), 0)
+        stale = (
+            self.order_by('pk').annotate(actual=actual)
+            .exclude(comment_count=F('actual'))
+            .values_list('pk', flat=True)
+        )
+        updated, last_pk = 0, 0
+        while True:
+            pks = list(stale.filter(pk__gt=last_pk)[:batch_size])
+            if not pks:
+                return updated
+            updated += News.objects.filter(pk__in=pks).update(
+                comment_count=actual, updated=timezone.now()
+            )
+            evict_news_items(pks)
+            last_pk = pks[-1]
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвигает счётчик комментариев на delta."""
+        changes = {
+            'comment_count': F('comment_count') + delta,
+            'updated': timezone.now(),
+        }
+        if delta < 0:
+            return self.filter(comment_count__gte=-delta).update(**changes)
+        return self.update(**changes)
+
+    def delete(self):
+        """Комментарии удаляются вместе с новостями без правки счётчиков."""
+        with bulk_comment_deletion(Comment.objects.filter(news__in=self)):
+            return super().delete()
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Время последней правки новости или её ветки комментариев.
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+            models.Index(fields=('updated',), name='news_updated_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def delete(self, *args, **kwargs):
+        with bulk_comment_deletion(self.comment_set.all()):
+            return super().delete(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def delete(self):
+        """
+        Удаляет комментарии и пересчитывает счётчики их новостей.
+
+        Вместо UPDATE на каждый удалённый комментарий — один UPDATE
+        с подзапросом Count на каждые SQL_PARAMS_LIMIT новостей, а из
+        индекса комментарии убираются одним DELETE.
+        """
+        news_ids = list(
+            self.order_by().values_list('news', flat=True).distinct()
+        )
+        with bulk_comment_deletion(self):
+            deleted = super().delete()
+            for start in range(0, len(news_ids), SQL_PARAMS_LIMIT):
+                News.objects.filter(
+                    pk__in=news_ids[start:start + SQL_PARAMS_LIMIT]
+                ).recount_comments()
+        return deleted
+
+    def bulk_create(self, objs, *args, update_related=True, **kwargs):
+        """
+        Массовое создание комментариев с обновлением счётчиков новостей.
+
+        bulk_create() не отправляет сигналы, поэтому счётчики
+        сдвигаются здесь: один UPDATE на каждую затронутую новость.
+        Здесь же комментарии попадают в поисковый индекс.
+        С update_related=False ни счётчики, ни индекс, ни кеш не
+        трогаются: после массовой загрузки их пересчитывают целиком.
+        """
+        from .search import index_new_comments
+
+        if not update_related:
+            return super().bulk_create(objs, *args, **kwargs)
+        last_id = self.aggregate(last=Max('pk'))['last'] or 0
+        objs = super().bulk_create(objs, *args, **kwargs)
+        counts = Counter(comment.news_id for comment in objs)
+        index_new_comments(last_id, [comment.pk for comment in objs])
+        if kwargs.get('ignore_conflicts'):
+            # Часть строк могла не вставиться — считаем честно.
+            News.objects.filter(pk__in=counts).recount_comments()
+            return objs
+        for news_id, count in counts.items():
+            News.objects.filter(pk=news_id).change_comment_count(count)
+        evict_news_items(counts)
+        return objs
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -29,9 +170,33 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    # Меняется и при правке текста; по нему проверяется свежесть
+    # страниц с комментарием, см. news/conditional.py.
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(fields=('updated',), name='comment_updated_idx'),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class BadWord(models.Model):
+    word = models.CharField('Слово', max_length=100, unique=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Запрещённое слово'
+        verbose_name_plural = 'Запрещённые слова'
+
+    def __str__(self):
+        return self.word
@@ -2,9 +2,36 @@ from datetime import datetime, timedelta
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
 
 from news.models import Comment, News
+from news.search import FTS_TABLE
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """
+    Возвращает сохранённую базу (--reuse-db) к виду только что созданной.
+
+    Тесты с transaction=True очищают таблицы моделей, но не счётчики
+    AUTOINCREMENT и не поисковый индекс, и в следующем запуске объекты
+    получили бы не те id, что ждут тесты. Без записи в sqlite_sequence
+    id продолжаются от наибольшего в таблице.
+    """
+    if connection.vendor == 'sqlite':
+        with django_db_blocker.unblock(), connection.cursor() as cursor:
+            cursor.execute('DELETE FROM sqlite_sequence')
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фрагменты из кеша не должны переживать откат транзакции теста."""
+    cache.clear()
+    yield
+    cache.clear()
 
 
 @pytest.fixture
@@ -55,6 +82,28 @@ def news_list():
     return news_list or None
 
 
+@pytest.fixture
+def crowded_news(django_user_model):
+    """Много новостей и ветка из тысячи комментариев разных авторов."""
+    News.objects.bulk_create(
+        News(title=f'Новость {i}', text='Текст новости')
+        for i in range(NEWS_IN_CROWD)
+    )
+    news = News.objects.first()
+    authors = django_user_model.objects.bulk_create(
+        django_user_model(username=f'Комментатор {i}')
+        for i in range(AUTHORS_IN_CROWD)
+    )
+    authors = list(django_user_model.objects.filter(
+        username__in=[author.username for author in authors]
+    ))
+    Comment.objects.bulk_create(
+        Comment(news=news, author=authors[i % len(authors)], text=f'Текст {i}')
+        for i in range(COMMENTS_IN_CROWD)
+    )
+    return news
+
+
 @pytest.fixture
 def form_data():
     return {
@@ -73,4 +122,7 @@ def comment(author, news):
 
 
 COMMENT_TEXT = 'Текст комментария'
+NEWS_IN_CROWD = 500
+AUTHORS_IN_CROWD = 50
+COMMENTS_IN_CROWD = 1000
 NEW_COMMENT_TEXT = 'Новый текст комментария'
@@ -0,0 +1,124 @@
+from datetime import date, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.admin import NEWS_LOOKUP, RECENT_COMMENTS
+from news.models import Comment, News
+from yacommon.admin import CURSOR_VAR
+from yacommon.db import estimated_row_count
+
+pytestmark = pytest.mark.django_db
+
+CHANGELIST = 'admin:news_comment_changelist'
+
+
+def test_comment_changelist_pages_by_cursor(admin_client, crowded_news):
+    crowded_news.refresh_from_db()
+    url = reverse(CHANGELIST)
+    seen = []
+    cursor = None
+    while True:
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.get(
+                url, {CURSOR_VAR: cursor} if cursor else {}
+            )
+        statements = [query['sql'] for query in captured]
+        assert response.status_code == HTTPStatus.OK
+        # Ни COUNT(*), ни OFFSET по таблице комментариев.
+        assert not any(
+            'COUNT(' in sql and 'news_comment' in sql
+            or 'OFFSET' in sql
+            for sql in statements
+        ), '\n'.join(statements)
+        changelist = response.context['cl']
+        assert changelist.result_count == crowded_news.comment_count
+        seen += [comment.pk for comment in changelist.result_list]
+        if not changelist.page.has_next():
+            break
+        cursor = changelist.page.next_cursor
+    assert seen == sorted(
+        Comment.objects.values_list('pk', flat=True), reverse=True
+    )
+
+
+def test_comment_changelist_filtered_by_news(admin_client, comment, news):
+    other_news = News.objects.create(title='Другая', text='Текст')
+    other = Comment.objects.create(
+        news=other_news, author=comment.author, text='Чужой комментарий'
+    )
+    response = admin_client.get(reverse(CHANGELIST), {NEWS_LOOKUP: news.pk})
+    changelist = response.context['cl']
+    assert changelist.result_count == 1
+    assert list(changelist.result_list) == [comment]
+    assert other not in changelist.result_list
+
+
+def test_comment_changelist_bad_cursor(admin_client, comment):
+    response = admin_client.get(reverse(CHANGELIST), {CURSOR_VAR: 'мусор'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url.endswith('?e=1')
+
+
+def test_news_change_page_shows_recent_comments(admin_client, crowded_news):
+    response = admin_client.get(
+        reverse('admin:news_news_change', args=(crowded_news.pk,))
+    )
+    formset = response.context['inline_admin_formsets'][0].formset
+    recent = Comment.objects.filter(news=crowded_news).order_by(
+        '-created', '-id'
+    )[:RECENT_COMMENTS]
+    assert {form.instance for form in formset} == set(recent)
+    assert (
+        f'{reverse(CHANGELIST)}?{NEWS_LOOKUP}={crowded_news.pk}'
+        in response.content.decode()
+    )
+
+
+def test_news_changelist_is_not_counted(admin_client, news_list):
+    with CaptureQueriesContext(connection) as captured:
+        response = admin_client.get(reverse('admin:news_news_changelist'))
+    statements = [query['sql'] for query in captured]
+    changelist = response.context['cl']
+    assert changelist.result_count == News.objects.latest('id').pk
+    assert not any(
+        'COUNT(' in sql and 'news_news' in sql for sql in statements
+    ), '\n'.join(statements)
+    assert list(changelist.result_list) == list(
+        News.objects.order_by('-date', '-id')[:changelist.list_per_page]
+    )
+
+
+def test_news_changelist_filters_by_date(admin_client, news_list):
+    today = date.today()
+    response = admin_client.get(
+        reverse('admin:news_news_changelist'),
+        {'date__gte': today, 'date__lt': today + timedelta(days=1)},
+    )
+    assert [news.date for news in response.context['cl'].result_list] == [
+        today
+    ]
+
+
+def test_news_changelist_searches_fts_index(admin_client, news, author):
+    other = News.objects.create(title='Погода', text='Дождь')
+    Comment.objects.create(news=other, author=author, text='Новости дня')
+    with CaptureQueriesContext(connection) as captured:
+        response = admin_client.get(
+            reverse('admin:news_news_changelist'), {'q': 'новост'}
+        )
+    statements = [query['sql'] for query in captured]
+    assert list(response.context['cl'].result_list) == [news]
+    assert any('MATCH' in sql for sql in statements)
+    assert not any('LIKE' in sql for sql in statements)
+
+
+def test_estimated_row_count_uses_statistics(news_list):
+    News.objects.order_by('id').first().delete()
+    assert estimated_row_count(News) == News.objects.latest('id').pk
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    assert estimated_row_count(News) == len(news_list) - 1
@@ -0,0 +1,66 @@
+import asyncio
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import pytest
+from django.test import AsyncClient
+from django.urls import include, path, reverse
+
+from news import urls as news_urls
+from news import views
+from news.models import Comment
+from yacommon.metrics import REGISTRY
+from yanews.urls import auth_urls
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+# Как news.urls при NEWS_ASYNC_VIEWS = True: первые совпадения побеждают.
+urlpatterns = [
+    path('', include((
+        [
+            path('', views.news_list_async, name='home'),
+            path('news/<int:pk>/', views.news_detail_async, name='detail'),
+            *news_urls.urlpatterns,
+        ],
+        'news',
+    ))),
+    path('auth/', include(auth_urls)),
+]
+
+
+@pytest.fixture(autouse=True)
+def async_urls(settings):
+    settings.ROOT_URLCONF = __name__
+
+
+@pytest.fixture
+def async_client():
+    return AsyncClient()
+
+
+def test_async_views_render_pages(async_client, news_list, comment):
+    REGISTRY.reset()
+    response = asyncio.run(async_client.get(reverse('news:home')))
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['object_list']) == len(news_list) - 1
+    response = asyncio.run(async_client.get(
+        reverse('news:detail', args=(comment.news_id,))
+    ))
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context['comments']) == [comment]
+    # Запросы из пула потоков попадают в метрики запроса.
+    assert 'http_request_db_queries_sum{view="news:home"} 2' in (
+        REGISTRY.export()
+    )
+
+
+def test_async_detail_accepts_comments(async_client, author, news, form_data):
+    async_client.force_login(author)
+    # Разбор multipart в AsyncClient Django 3.2 не работает.
+    response = asyncio.run(async_client.post(
+        reverse('news:detail', args=(news.pk,)),
+        urlencode(form_data),
+        content_type='application/x-www-form-urlencoded',
+    ))
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.get().text == form_data['text']
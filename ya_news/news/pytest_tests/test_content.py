@@ -1,11 +1,28 @@
-from datetime import date
+from datetime import date, timedelta
+from http import HTTPStatus
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.module_loading import import_string
+from pytest_lazyfixture import lazy_fixture
 
 from news.forms import CommentForm
+from news.models import Comment, News
+from yacommon.metrics import CONTENT_TYPE, REGISTRY
+from yacommon.settings_production import shared_cache
+from yacommon.warmup import warm_up_templates
+from yanews.settings_production import CACHES as PRODUCTION_CACHES
+from yanews.settings_production import TEMPLATES
 
 pytestmark = pytest.mark.django_db
 
@@ -44,3 +61,214 @@ def test_comments_order(client, news, comments_list):
     assert comments_list == sorted(
         comments_list, key=lambda time: time.created
     )
+
+
+def test_news_cursor_pagination(client, news_list):
+    url = reverse('news:home')
+    first_page = client.get(url).context['page_obj']
+    assert first_page.has_next() and not first_page.has_previous()
+    response = client.get(url, {'cursor': first_page.next_cursor})
+    second_page = response.context['page_obj']
+    assert [news.title for news in second_page] == [news_list[-1].title]
+    assert not second_page.has_next()
+    response = client.get(url, {'cursor': second_page.previous_cursor})
+    assert list(response.context['object_list']) == list(first_page)
+
+
+def test_news_bad_cursor(client, news_list):
+    response = client.get(reverse('news:home'), {'cursor': 'мусор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comments_are_paginated(client, news, comments_list, settings):
+    settings.COMMENTS_COUNT_ON_PAGE = 2
+    response = client.get(reverse('news:detail', args=(PK,)))
+    first_page = response.context['comments']
+    assert len(first_page) == 2 and first_page.has_next()
+    response = client.get(
+        reverse('news:comments', args=(PK,)),
+        {'cursor': first_page.next_cursor},
+    )
+    second_page = response.context['comments']
+    assert [comment.text for comment in second_page] == ['Комментарий 2']
+    assert not second_page.has_next()
+    assert 'Комментарий 2' in response.content.decode()
+
+
+def test_search_ranks_and_highlights(client, author):
+    in_title = News.objects.create(title='Выборы мэра', text='Итоги')
+    in_comment = News.objects.create(title='Погода', text='Дождь')
+    Comment.objects.create(
+        news=in_comment, author=author, text='Про <выборы> ни слова'
+    )
+    response = client.get(reverse('news:search'), {'q': 'выбор'})
+    results = response.context['object_list']
+    assert [result.news for result in results] == [in_title, in_comment]
+    assert results[1].snippet == 'Про &lt;<mark>выборы</mark>&gt; ни слова'
+    assert '<mark>Выборы</mark> мэра' in response.content.decode()
+
+
+def test_warm_up_fills_template_cache(settings):
+    settings.TEMPLATES = TEMPLATES
+    timings = warm_up_templates()
+    assert {
+        'base.html', 'includes/header.html', 'news/home.html',
+        'news/detail.html',
+    } <= set(timings)
+    loader, = engines['django'].engine.template_loaders
+    assert set(timings) <= set(loader.get_template_cache)
+
+
+def test_metrics_are_exported(client, news):
+    REGISTRY.reset()
+    with CaptureQueriesContext(connection) as captured:
+        client.get(reverse('news:detail', args=(news.pk,)))
+    # Следующий запрос клиента очистит connection.queries.
+    queries = len(captured)
+    response = client.get(reverse('metrics'))
+    assert response['Content-Type'] == CONTENT_TYPE
+    content = response.content.decode()
+    for line in (
+        f'http_request_db_queries_sum{{view="news:detail"}} {queries}',
+        'http_request_duration_seconds_count{view="news:detail"} 1',
+        'http_request_template_duration_seconds_bucket'
+        '{view="news:detail",le="+Inf"} 1',
+        'http_request_recent_duration_seconds_count{view="news:detail"} 1',
+    ):
+        assert line in content
+    response = client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('name', ('news:home', 'news:detail'))
+@pytest.mark.parametrize(
+    'test_client', (lazy_fixture('client'), lazy_fixture('author_client'))
+)
+def test_unchanged_page_is_not_modified(name, test_client, comment):
+    url = reverse(name, args=(PK,) if name == 'news:detail' else ())
+    response = test_client.get(url)
+    assert response['ETag'] and response['Last-Modified']
+    for headers in (
+        {'HTTP_IF_NONE_MATCH': response['ETag']},
+        {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+    ):
+        not_modified = test_client.get(url, **headers)
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        # Шаблоны не отрисовываются.
+        assert not not_modified.templates and not not_modified.content
+
+
+@pytest.mark.parametrize('name', ('news:home', 'news:detail'))
+def test_etag_depends_on_user(name, client, admin_client, comment):
+    url = reverse(name, args=(PK,) if name == 'news:detail' else ())
+    etag = client.get(url)['ETag']
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.parametrize('name', ('news:home', 'news:detail'))
+def test_comment_changes_validators(
+    name, author_client, comment, form_data
+):
+    url = reverse(name, args=(PK,) if name == 'news:detail' else ())
+    etags = [author_client.get(url)['ETag']]
+    for change in (
+        lambda: author_client.post(
+            reverse('news:edit', args=(comment.pk,)), data=form_data
+        ),
+        lambda: author_client.post(
+            reverse('news:detail', args=(PK,)), data=form_data
+        ),
+        lambda: author_client.post(reverse('news:delete', args=(comment.pk,))),
+    ):
+        change()
+        response = author_client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+        assert response.status_code == HTTPStatus.OK
+        etags.append(response['ETag'])
+    assert len(set(etags)) == len(etags)
+
+
+def test_last_modified_is_latest_change(client, news, comment):
+    response = client.get(reverse('news:detail', args=(PK,)))
+    news.refresh_from_db()
+    assert response['Last-Modified'] == http_date(
+        max(news.updated, comment.updated).timestamp()
+    )
+
+
+@pytest.fixture
+def stale_validators(client, news, comment):
+    """
+    Валидаторы страниц, сдвинутые на час назад.
+
+    Last-Modified точен до секунды, поэтому без сдвига правка в ту же
+    секунду, что и первый запрос, не была бы видна в If-Modified-Since.
+    """
+    hour_ago = timezone.now() - timedelta(hours=1)
+    News.objects.update(updated=hour_ago)
+    Comment.objects.update(updated=hour_ago)
+    validators = {}
+    for name in ('news:home', 'news:detail'):
+        url = reverse(name, args=(PK,) if name == 'news:detail' else ())
+        response = client.get(url)
+        validators[url] = (
+            {'HTTP_IF_NONE_MATCH': response['ETag']},
+            {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+        )
+    return validators
+
+
+def assert_modified(client, validators):
+    for url, headers_variants in validators.items():
+        for headers in headers_variants:
+            response = client.get(url, **headers)
+            assert response.status_code == HTTPStatus.OK, (url, headers)
+
+
+def test_news_edit_changes_validators(client, news, stale_validators):
+    news.title = 'Исправленный заголовок'
+    news.save()
+    assert_modified(client, stale_validators)
+
+
+def test_same_day_news_changes_validators(client, news, stale_validators):
+    News.objects.create(title='Ещё новость', text='Текст', date=news.date)
+    home = reverse('news:home')
+    assert_modified(client, {home: stale_validators[home]})
+
+
+def test_production_cache_is_shared_between_processes(tmp_path, monkeypatch):
+    """Фрагмент, удалённый одним процессом, пропадает и у другого."""
+    backend = import_string(PRODUCTION_CACHES['default']['BACKEND'])
+    # Кеш в памяти процесса не годится: правка в одном процессе
+    # не сбросит фрагмент у остальных.
+    assert not issubclass(backend, (LocMemCache, DummyCache))
+    monkeypatch.setenv('DJANGO_CACHE_DIR', str(tmp_path))
+    config = shared_cache(settings.BASE_DIR)['default']
+    assert config['BACKEND'] == PRODUCTION_CACHES['default']['BACKEND']
+    first, second = (
+        backend(config['LOCATION'], config.get('OPTIONS', {}))
+        for _ in range(2)
+    )
+    first.set('fragment', 'старая новость')
+    assert second.get('fragment') == 'старая новость'
+    second.delete('fragment')
+    assert first.get('fragment') is None
+
+
+@pytest.mark.parametrize('timeout, cached', ((60, True), (0, False)))
+def test_header_fragment_follows_settings(
+    settings, author_client, timeout, cached
+):
+    settings.NEWS_CACHE_TIMEOUT = timeout
+    author_client.get(reverse('news:home'))
+    key = make_template_fragment_key('header', [True, 'Autor'])
+    assert (cache.get(key) is not None) is cached
+
+
+def test_header_depends_on_login_state(author_client):
+    url = reverse('news:home')
+    assert 'Выйти' in author_client.get(url).content.decode()
+    author_client.logout()
+    assert 'Войти' in author_client.get(url).content.decode()
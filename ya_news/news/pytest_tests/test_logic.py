@@ -1,13 +1,28 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
+from io import StringIO
 from random import choice
 
 import pytest
 from conftest import COMMENT_TEXT, NEW_COMMENT_TEXT
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.bad_words import BadWordsDictionary
+from news.cache import news_item_key
+from news.management.commands.load_news_bulk import iter_json_array
+from news.forms import (BAD_WORDS, BAD_WORDS_DICTIONARY, WARNING,
+                        CommentForm)
+from news.models import BadWord, Comment, News
+from news.search import FTS_TABLE, comment_rowid, search_news
+from yacommon.db import apply_sqlite_pragmas
 
 pytestmark = pytest.mark.django_db
 
@@ -99,3 +114,369 @@ def test_user_cant_edit_comment_of_another_user(
     assert expected_count == comments_count
     assert comment.text == COMMENT_TEXT
     assert comment.author == author
+
+
+def test_comment_count_follows_create_and_delete(
+    author_client, news, form_data
+):
+    url_detail = reverse('news:detail', args=(PK,))
+    author_client.post(url_detail, data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    author_client.delete(reverse('news:delete', args=(PK,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_comment_count_follows_bulk_and_cascade(author, admin_user, news):
+    Comment.objects.bulk_create(
+        Comment(news=news, author=user, text=f'Комментарий {i}')
+        for i, user in enumerate((author, admin_user, author))
+    )
+    news.refresh_from_db()
+    assert news.comment_count == 3
+    author.delete()
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    News.objects.update(comment_count=0)
+    News.objects.recount_comments()
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_recount_evicts_only_changed_news(news_list):
+    stale, fresh = News.objects.order_by('pk')[:2]
+    News.objects.filter(pk=stale.pk).update(comment_count=5)
+    cache.set_many({
+        news_item_key(pk): 'фрагмент'
+        for pk in News.objects.values_list('pk', flat=True)
+    })
+    assert News.objects.recount_comments(batch_size=2) == 1
+    assert cache.get(news_item_key(stale.pk)) is None
+    assert cache.get(news_item_key(fresh.pk)) == 'фрагмент'
+    stale.refresh_from_db()
+    assert stale.comment_count == 0
+
+
+def news_updates(captured):
+    return [
+        query['sql'] for query in captured
+        if query['sql'].startswith('UPDATE "news_news"')
+    ]
+
+
+def search_deletes(captured):
+    return [
+        query['sql'] for query in captured
+        if query['sql'].startswith(f'DELETE FROM {FTS_TABLE}')
+    ]
+
+
+def test_comment_queryset_delete_recounts_once(author, news):
+    other = News.objects.create(title='Другая', text='Текст')
+    Comment.objects.bulk_create(
+        Comment(news=target, author=author, text=f'Комментарий {i}')
+        for i, target in enumerate((news, news, news, other, other))
+    )
+    with CaptureQueriesContext(connection) as captured:
+        Comment.objects.exclude(text='Комментарий 0').delete()
+    assert len(news_updates(captured)) == 1
+    assert len(search_deletes(captured)) == 1
+    assert [result.news for result in search_news('комментарий', 10)] == [
+        news
+    ]
+    assert dict(News.objects.values_list('pk', 'comment_count')) == {
+        news.pk: 1, other.pk: 0,
+    }
+
+
+def test_news_delete_skips_comment_count(author, news, comments_list):
+    with CaptureQueriesContext(connection) as captured:
+        news.delete()
+    assert news_updates(captured) == []
+    # Один DELETE для комментариев и один для самой новости.
+    assert len(search_deletes(captured)) == 2
+    assert not Comment.objects.exists()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        assert cursor.fetchone() == (0,)
+
+
+@pytest.mark.parametrize(
+    'backend',
+    (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.filebased.FileBasedCache',
+    ),
+)
+def test_comment_evicts_only_its_news_fragment(
+    author_client, news_list, form_data, settings, tmp_path, backend
+):
+    settings.CACHES = {
+        'default': {'BACKEND': backend, 'LOCATION': str(tmp_path)},
+    }
+    commented, untouched = News.objects.all()[:2]
+    author_client.get(reverse('news:home'))
+    assert cache.get(news_item_key(commented.pk)) is not None
+    assert cache.get(news_item_key(untouched.pk)) is not None
+    author_client.post(
+        reverse('news:detail', args=(commented.pk,)), data=form_data
+    )
+    assert cache.get(news_item_key(commented.pk)) is None
+    assert cache.get(news_item_key(untouched.pk)) is not None
+    response = author_client.get(reverse('news:home'))
+    assert 'Комментариев: 1' in response.content.decode()
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('Ах ты, редиска!', ['редиска']),
+        ('Не будь редиской, негодяем и РЕДИСКОЙ', ['редиска', 'негодяй']),
+        ('Редисковый салат', []),
+        ('Обычный текст без ругани', []),
+    ),
+)
+def test_bad_words_matcher(text, expected):
+    form = CommentForm(data={'text': text})
+    assert form.is_valid() is not expected
+    assert getattr(form, 'bad_words', []) == expected
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        'редискааа', 'суперредиска', 'РЕДИСКА!', 'Ах ты, редиска',
+        'негодяйство', 'Ну ты и негодяй', 'суперНЕГОДЯЙ',
+    ),
+)
+def test_bad_words_matcher_keeps_substring_check(text):
+    """Всё, что отклоняла прежняя проверка подстрокой, отклоняется."""
+    assert any(word in text.lower() for word in BAD_WORDS)
+    assert not CommentForm(data={'text': text}).is_valid()
+
+
+def test_bad_words_from_database(author_client, news, monkeypatch):
+    # Свой словарь: общий BAD_WORDS_DICTIONARY запомнил бы слово
+    # и после отката транзакции теста.
+    monkeypatch.setattr(
+        'news.forms.BAD_WORDS_DICTIONARY',
+        BadWordsDictionary(BAD_WORDS, path=BAD_WORDS_DICTIONARY.path),
+    )
+    BadWord.objects.create(word='паразит')
+    response = author_client.post(
+        reverse('news:detail', args=(PK,)), data={'text': 'Все вы паразиты'}
+    )
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    assert Comment.objects.count() == 0
+
+
+def test_bad_words_file_is_reloaded(tmp_path):
+    path = tmp_path / 'bad_words.txt'
+    path.write_text('# словарь\nмошенник\n', encoding='utf-8')
+    dictionary = BadWordsDictionary(path=path, check_interval=0)
+    old_matcher = dictionary.matcher
+    assert dictionary.matches('Мошенники!') == ['мошенник']
+    path.write_text('хулиган\n', encoding='utf-8')
+    os.utime(path, ns=(1, 1))
+    assert dictionary.matches('Мошенники и хулиганы!') == ['хулиган']
+    assert dictionary.matcher is not old_matcher
+    assert old_matcher.matches('мошенник') == ['мошенник']
+
+
+def test_search_index_follows_changes(author, news, comment):
+    assert [result.news for result in search_news('комментария', 10)] == [
+        news
+    ]
+    comment.text = 'Исправленный отзыв'
+    comment.save()
+    assert search_news('комментария', 10) == []
+    Comment.objects.bulk_create(
+        [Comment(news=news, author=author, text='Массовый отзыв')]
+    )
+    assert len(search_news('массовый', 10)) == 1
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    call_command('rebuild_search_index', chunk_size=1, stdout=StringIO())
+    assert len(search_news('отзыв', 10)) == 1
+    news.delete()
+    assert search_news('отзыв', 10) == []
+
+
+def test_rebuild_search_index_by_ranges(news, comment):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {FTS_TABLE} SET body = %s WHERE rowid = %s',
+            ['устаревший текст', comment_rowid(comment.pk)],
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, news_id, title, body) '
+            "VALUES (%s, %s, '', 'удалённый отзыв')",
+            [comment_rowid(comment.pk + 10), news.pk],
+        )
+    with CaptureQueriesContext(connection) as captured:
+        call_command('rebuild_search_index', chunk_size=1, stdout=StringIO())
+    # Индекс не очищается целиком: поиск работает во время перестройки.
+    assert all(
+        'WHERE rowid' in query['sql'] for query in captured
+        if query['sql'].startswith(f'DELETE FROM {FTS_TABLE}')
+    )
+    assert search_news('устаревший', 10) == []
+    assert search_news('удалённый', 10) == []
+    assert [result.news for result in search_news('комментария', 10)] == [
+        news
+    ]
+
+
+def test_sqlite_pragmas_are_applied(settings):
+    settings.SQLITE_PRAGMAS = {'cache_size': -4096}
+    apply_sqlite_pragmas(sender=None, connection=connection)
+    with connection.cursor() as cursor:
+        assert cursor.execute('PRAGMA cache_size').fetchone() == (-4096,)
+        cursor.execute('PRAGMA cache_size = -2000')
+
+
+def test_json_array_is_parsed_incrementally():
+    text = json.dumps(
+        [{'model': 'news.news', 'fields': {'title': 'Скобки ]}[{ и ,'}}] * 3
+    )
+    assert list(iter_json_array(iter(text))) == json.loads(text)
+    assert list(iter_json_array(['[', ' ]'])) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(iter(text[:-1])))
+
+
+def test_json_array_rejects_unclosed_item():
+    read = []
+
+    def chunks():
+        yield '[{"title": "Ёж"}, {"title": "без конца'
+        while True:
+            read.append(1)
+            yield ' и края' * 10
+
+    with pytest.raises(ValueError, match='с байта 20 длиннее 100'):
+        list(iter_json_array(chunks(), max_item_size=100))
+    # Чтение остановилось на ограничении, а не в конце потока.
+    assert len(read) < 3
+
+
+def test_load_news_bulk_reads_fixture(settings):
+    path = settings.BASE_DIR / 'news' / 'fixtures' / 'news.json'
+    fixture = json.loads(path.read_text(encoding='utf-8'))
+    call_command(
+        'load_news_bulk', path, transaction_size=5, stdout=StringIO()
+    )
+    assert sorted(News.objects.values_list('title', flat=True)) == sorted(
+        obj['fields']['title'] for obj in fixture
+    )
+    assert len(search_news('Yatube', 10)) == sum(
+        'Yatube' in obj['fields']['title'] for obj in fixture
+    )
+
+
+@pytest.mark.parametrize('fast', (False, True))
+def test_load_news_bulk_reads_ndjson(tmp_path, author, fast):
+    created = datetime(2022, 11, 1, 12, tzinfo=timezone.utc)
+    objects = [
+        {'model': 'news.news', 'pk': 7,
+         'fields': {'title': 'Новость', 'text': 'Текст', 'date': '2022-11-01',
+                    'comment_count': 100}},
+        *(
+            {'model': 'news.comment',
+             'fields': {'news': 7, 'author': author.pk,
+                        'text': f'Отзыв {i}', 'created': created.isoformat()}}
+            for i in range(3)
+        ),
+    ]
+    path = tmp_path / 'news.ndjson'
+    path.write_text(
+        '\n'.join(json.dumps(obj, ensure_ascii=False) for obj in objects),
+        encoding='utf-8',
+    )
+    stdout = StringIO()
+    with CaptureQueriesContext(connection) as captured:
+        call_command(
+            'load_news_bulk', path, transaction_size=2, stdout=stdout,
+            no_signals=fast, no_constraints=fast,
+        )
+    assert 'комментариев: 3' in stdout.getvalue()
+    # Индексируются вставленные строки, без прохода по ветке новости.
+    assert not any('NOT EXISTS' in query['sql'] for query in captured)
+    news = News.objects.get(pk=7)
+    assert news.comment_count == 3
+    assert set(news.comment_set.values_list('created', flat=True)) == {
+        created
+    }
+    assert [result.news for result in search_news('отзыв', 10)] == [news]
+
+
+def test_load_news_bulk_rejects_other_models(tmp_path, author):
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps(
+        [{'model': 'auth.user', 'fields': {'username': 'Новый'}}]
+    ))
+    with pytest.raises(CommandError):
+        call_command('load_news_bulk', path, stdout=StringIO())
+
+
+def generated_data(**options):
+    options = {
+        'users': 5, 'news': 20, 'comments': 300, 'seed': 7,
+        'until': datetime(2022, 11, 1), 'days': 30, **options,
+    }
+    call_command('generate_data', stdout=StringIO(), **options)
+    return (
+        list(News.objects.order_by('pk').values_list(
+            'title', 'date', 'comment_count'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'news__title', 'author__username', 'text', 'created', 'updated'
+        )),
+    )
+
+
+def comment_indexes():
+    with connection.cursor() as cursor:
+        return cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = 'news_comment' ORDER BY name"
+        ).fetchall()
+
+
+def test_generate_data_is_reproducible():
+    indexes = comment_indexes()
+    news, comments = generated_data()
+    assert len(comments) == sum(count for *_, count in news) == 300
+    assert not News.objects.annotate(
+        actual=Count('comment')
+    ).exclude(comment_count=F('actual')).exists()
+    # Закон Ципфа: самой обсуждаемой новости достаётся заметная доля.
+    assert max(count for *_, count in news) > 3 * 300 / 20
+    first = datetime(2022, 10, 1, tzinfo=timezone.utc) - timedelta(hours=3)
+    last = datetime(2022, 11, 2, tzinfo=timezone.utc) - timedelta(hours=3)
+    assert all(
+        first <= created == updated < last
+        for *_, created, updated in comments
+    )
+    assert comment_indexes() == indexes
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        assert cursor.fetchone() == (len(news) + len(comments),)
+    News.objects.all().delete()
+    assert generated_data() == (news, comments)
+
+
+def test_generate_data_indexes_added_rows():
+    generated_data()
+    indexes = comment_indexes()
+    generated_data(news=2, comments=10, seed=8, username_prefix='new')
+    assert comment_indexes() == indexes
+    assert Comment.objects.filter(
+        author__username__startswith='new'
+    ).count() == 10
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        assert cursor.fetchone() == (
+            News.objects.count() + Comment.objects.count(),
+        )
@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+from pytest_lazyfixture import lazy_fixture
+
+pytestmark = pytest.mark.django_db
+
+ANONYMOUS = lazy_fixture('client')
+AUTHOR = lazy_fixture('crowd_author_client')
+
+
+@pytest.fixture
+def crowd_comment(crowded_news):
+    return crowded_news.comment_set.select_related('author').first()
+
+
+@pytest.fixture
+def crowd_author_client(client, crowd_comment):
+    client.force_login(crowd_comment.author)
+    return client
+
+
+@pytest.mark.parametrize(
+    'name, test_client, budget',
+    (
+        ('news:home', ANONYMOUS, 2),
+        ('news:home', AUTHOR, 4),
+        ('news:detail', ANONYMOUS, 3),
+        ('news:detail', AUTHOR, 5),
+        ('news:edit', AUTHOR, 4),
+        ('news:delete', AUTHOR, 4),
+    ),
+)
+def test_query_budget(
+    name, test_client, budget, crowd_comment, django_assert_max_num_queries
+):
+    """
+    Число запросов страницы не зависит от числа новостей и комментариев.
+
+    Кеш фрагментов пуст, поэтому проверяется худший случай.
+    """
+    args = {
+        'news:home': (),
+        'news:detail': (crowd_comment.news_id,),
+    }.get(name, (crowd_comment.pk,))
+    with django_assert_max_num_queries(budget):
+        test_client.get(reverse(name, args=args))
+
+
+def test_comment_post_loads_news_once(
+    author_client, news, form_data, django_assert_max_num_queries
+):
+    """Одна выборка новости, одна вставка комментария и перенаправление."""
+    url = reverse('news:detail', args=(news.pk,))
+    with django_assert_max_num_queries(8) as captured:
+        response = author_client.post(url, data=form_data)
+    statements = [query['sql'] for query in captured.captured_queries]
+    assertRedirects(response, f'{url}#comments')
+    assert sum(
+        sql.startswith('SELECT "news_news"') for sql in statements
+    ) == 1
+    assert sum(
+        sql.startswith('INSERT INTO "news_comment"') for sql in statements
+    ) == 1
@@ -0,0 +1,212 @@
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from yacommon.db import SQL_PARAMS_LIMIT
+
+from .models import News
+
+FTS_TABLE = 'news_search'
+WORD = re.compile(r'\w+')
+# Заголовок новости весит больше текста новости и комментариев.
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+SNIPPET_TOKENS = 12
+# Во сколько раз больше строк, чем нужно новостей, берётся из индекса.
+HITS_OVERFETCH = 4
+# Символы-маркеры подсветки: не встречаются в тексте и не
+# экранируются, поэтому их можно заменить на теги после escape().
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def news_rowid(news_id):
+    """Строки новостей и комментариев делят rowid: чётные и нечётные."""
+    return news_id * 2
+
+
+def comment_rowid(comment_id):
+    return comment_id * 2 + 1
+
+
+def build_match_query(text):
+    """Слова пользователя как префиксы через AND, без синтаксиса FTS5."""
+    return ' '.join(f'"{word}"*' for word in WORD.findall(text))
+
+
+def _execute(sql, params=()):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def index_news(news):
+    _execute(
+        f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, news_id, title, body) '
+        'VALUES (%s, %s, %s, %s)',
+        [news_rowid(news.pk), news.pk, news.title, news.text],
+    )
+
+
+def unindex_news(news_id):
+    _execute(
+        f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [news_rowid(news_id)]
+    )
+
+
+def index_comment(comment):
+    _execute(
+        f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, news_id, title, body) '
+        "VALUES (%s, %s, '', %s)",
+        [comment_rowid(comment.pk), comment.news_id, comment.text],
+    )
+
+
+def unindex_comment(comment_id):
+    _execute(
+        f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+        [comment_rowid(comment_id)],
+    )
+
+
+def unindex_comments(queryset):
+    """Убирает из индекса комментарии queryset одним DELETE."""
+    sql, params = queryset.order_by().values_list('id').query.sql_with_params()
+    _execute(
+        f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+        f'(SELECT id * 2 + 1 FROM ({sql}))',
+        params,
+    )
+
+
+def _index_new_rows(select, after_id, ids):
+    """Выполняет select для id больше after_id и для перечисленных ids."""
+    _execute(select + 'id > %s', [after_id])
+    ids = [pk for pk in ids if pk is not None and pk <= after_id]
+    for start in range(0, len(ids), SQL_PARAMS_LIMIT):
+        chunk = ids[start:start + SQL_PARAMS_LIMIT]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        _execute(select + f'id IN ({placeholders})', chunk)
+
+
+def index_new_comments(after_id, comment_ids=()):
+    """
+    Индексирует комментарии с id больше after_id и перечисленные
+    comment_ids.
+
+    Нужен после Comment.objects.bulk_create(): сигналы не отправляются,
+    а SQLite не возвращает id вставленных строк. Обе выборки идут по
+    первичному ключу, сколько бы комментариев ни было у новостей.
+    """
+    _index_new_rows(
+        f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, news_id, title, body) '
+        "SELECT id * 2 + 1, news_id, '', text FROM news_comment WHERE ",
+        after_id, comment_ids,
+    )
+
+
+def index_missing_news(after_id, news_ids=()):
+    """
+    Индексирует новости с id больше after_id и перечисленные news_ids.
+
+    Нужен после News.objects.bulk_create(): сигналы не отправляются,
+    а SQLite не возвращает id вставленных строк.
+    """
+    _index_new_rows(
+        f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, news_id, title, body) '
+        'SELECT id * 2, id, title, text FROM news_news WHERE ',
+        after_id, news_ids,
+    )
+
+
+def filter_news(queryset, text):
+    """
+    Новости queryset, в заголовке или тексте которых есть слова text.
+
+    Комментарии не учитываются. None, если поиск по индексу невозможен.
+    """
+    match_query = build_match_query(text)
+    if not match_query or not fts_available():
+        return None
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT news_id FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = news_id * 2',
+        [match_query],
+    ))
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+SearchResult = namedtuple('SearchResult', ('news', 'score', 'snippet'))
+
+
+def _best_hits(cursor, match_query, limit):
+    """
+    Лучшее совпадение для каждой из limit самых релевантных новостей.
+
+    Вспомогательные функции FTS5 нельзя вызывать внутри GROUP BY,
+    а материализация всех совпадений дорога, поэтому берём с запасом
+    ORDER BY bm25 LIMIT и отбрасываем повторы новостей в Python;
+    если новостей не хватило, запас удваивается.
+    """
+    fetch = limit * HITS_OVERFETCH
+    while True:
+        cursor.execute(
+            f'SELECT rowid, news_id, bm25({FTS_TABLE}, 0, %s, %s) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            'ORDER BY score LIMIT %s',
+            [TITLE_WEIGHT, BODY_WEIGHT, match_query, fetch],
+        )
+        rows = cursor.fetchall()
+        best = {}
+        for rowid, news_id, score in rows:
+            best.setdefault(news_id, (rowid, score))
+        if len(best) >= limit or len(rows) < fetch:
+            return list(best.items())[:limit]
+        fetch *= 2
+
+
+def search_news(text, limit):
+    """
+    Новости, подходящие под text, по убыванию релевантности BM25.
+
+    Новость находится и по своему тексту, и по комментариям; у каждой
+    выводится фрагмент лучшего совпадения с подсвеченными словами.
+    """
+    match_query = build_match_query(text)
+    if not match_query or not fts_available():
+        return []
+    with connection.cursor() as cursor:
+        hits = _best_hits(cursor, match_query, limit)
+        if not hits:
+            return []
+        rowids = [rowid for _, (rowid, _) in hits]
+        placeholders = ', '.join(['%s'] * len(rowids))
+        # Фрагменты строим только для попавших в выдачу строк.
+        cursor.execute(
+            f'SELECT rowid, snippet({FTS_TABLE}, -1, %s, %s, %s, %s) '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid IN ({placeholders})',
+            [MARK_START, MARK_END, '…', SNIPPET_TOKENS, match_query, *rowids],
+        )
+        snippets = dict(cursor.fetchall())
+    news = News.objects.in_bulk([news_id for news_id, _ in hits])
+    return [
+        SearchResult(news[news_id], -score, highlight(snippets[rowid]))
+        for news_id, (rowid, score) in hits if news_id in news
+    ]
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import evict_news_items
+from .models import BULK_COMMENT_DELETION, Comment, News
+from .search import (index_comment, index_news, unindex_comment,
+                     unindex_news)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Новый комментарий увеличивает счётчик своей новости."""
+    if created:
+        News.objects.filter(pk=instance.news_id).change_comment_count(1)
+        evict_news_items([instance.news_id])
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """
+    Удалённый комментарий уменьшает счётчик своей новости.
+
+    Сигнал приходит и при каскадном удалении вместе с автором.
+    При удалении новости и при QuerySet.delete() счётчик не
+    сдвигается, см. BULK_COMMENT_DELETION.
+    """
+    if BULK_COMMENT_DELETION.get():
+        return
+    News.objects.filter(pk=instance.news_id).change_comment_count(-1)
+    evict_news_items([instance.news_id])
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def evict_news_fragment(sender, instance, **kwargs):
+    """Изменённая или удалённая новость вытесняет только свой фрагмент."""
+    evict_news_items([instance.pk])
+
+
+@receiver(post_save, sender=News)
+def update_news_search_index(sender, instance, **kwargs):
+    index_news(instance)
+
+
+@receiver(post_delete, sender=News)
+def remove_news_from_search_index(sender, instance, **kwargs):
+    unindex_news(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_search_index(sender, instance, **kwargs):
+    index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_search_index(sender, instance, **kwargs):
+    if not BULK_COMMENT_DELETION.get():
+        unindex_comment(instance.pk)
@@ -0,0 +1,35 @@
+# Словари для правдоподобных заголовков новостей и комментариев к ним.
+NEWS_SUBJECTS = (
+    'Учёные', 'Студенты', 'Депутаты', 'Врачи', 'Археологи', 'Инженеры',
+    'Астрономы', 'Волонтёры', 'Школьники', 'Программисты', 'Фермеры',
+    'Спортсмены', 'Музыканты', 'Экологи', 'Биологи', 'Пожарные',
+)
+NEWS_VERBS = (
+    'обнаружили', 'создали', 'обсудили', 'представили', 'запустили',
+    'открыли', 'испытали', 'нашли', 'построили', 'изучили', 'спасли',
+    'отменили', 'поддержали', 'раскритиковали',
+)
+NEWS_OBJECTS = (
+    'новый вид бабочек', 'мобильное приложение', 'бюджет города',
+    'древний клад', 'детскую площадку', 'солнечную электростанцию',
+    'редкую комету', 'школьный музей', 'проект моста', 'новую вакцину',
+    'старый маяк', 'городской парк', 'робота-курьера', 'электробус',
+    'библиотеку', 'заповедник', 'фестиваль джаза', 'карту метро',
+)
+SENTENCES = (
+    'Отличная новость!', 'Не верю ни единому слову.',
+    'Давно пора было этим заняться.', 'Интересно, что будет дальше.',
+    'У нас в городе такое уже было.', 'Спасибо за подробности.',
+    'Хотелось бы больше фактов.', 'Наконец-то хоть что-то хорошее.',
+    'Надо проверить это самому.', 'Посмотрим, чем всё закончится.',
+    'Подробности обещают рассказать позже.',
+    'Эксперты пока не дают прогнозов.',
+    'Местные жители встретили новость с интересом.',
+)
+
+
+def news_title(rng, max_length):
+    return (
+        f'{rng.choice(NEWS_SUBJECTS)} {rng.choice(NEWS_VERBS)} '
+        f'{rng.choice(NEWS_OBJECTS)}'
+    )[:max_length]
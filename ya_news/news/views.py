@@ -1,59 +1,92 @@
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
+from django.http import Http404
 from django.urls import reverse
 from django.views import generic
 
+from yacommon.pagination import (CursorPaginationMixin, CursorPaginator,
+                                 InvalidCursor)
+
+from .aio import run_view
+from .conditional import conditional_news_page
 from .forms import CommentForm
 from .models import Comment, News
+from .search import search_news
 
 
-class NewsList(generic.ListView):
-    """Список новостей."""
+class NewsList(CursorPaginationMixin, generic.ListView):
+    """Лента новостей с курсорной пагинацией по (date, id)."""
     model = News
     template_name = 'news/home.html'
+    cursor_ordering = ('-date', '-id')
 
-    def get_queryset(self):
+    def get_paginate_by(self, queryset):
         """
-        Выводим только несколько последних новостей.
+        На странице выводим несколько последних новостей.
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return settings.NEWS_COUNT_ON_HOME_PAGE
 
 
-class NewsDetail(generic.DetailView):
-    model = News
-    template_name = 'news/detail.html'
+class NewsSearch(generic.ListView):
+    """Поиск по новостям и комментариям к ним."""
+    template_name = 'news/search.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj or None
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_news(self.query, settings.NEWS_COUNT_ON_HOME_PAGE)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['form'] = CommentForm()
+        context['query'] = self.query
         return context
 
 
-class NewsComment(
-        LoginRequiredMixin,
-        generic.detail.SingleObjectMixin,
-        generic.FormView
-):
+def paginate_comments(news, cursor=None):
+    """
+    Возвращает страницу комментариев к новости.
+
+    Комментарии идут в порядке Comment.Meta.ordering, с тай-брейком
+    по id, поэтому стоимость страницы не зависит от размера ветки.
+    """
+    paginator = CursorPaginator(
+        news.comment_set.select_related('author'),
+        settings.COMMENTS_COUNT_ON_PAGE,
+        ('created', 'id'),
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор.')
+
+
+class NewsDetailView(AccessMixin, generic.edit.FormMixin, generic.DetailView):
+    """
+    Страница новости с комментариями; POST добавляет комментарий.
+
+    Один объект представления на запрос: новость загружается один раз
+    и служит и для комментария, и для адреса перенаправления.
+    """
     model = News
-    form_class = CommentForm
     template_name = 'news/detail.html'
+    form_class = CommentForm
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if not self.request.user.is_authenticated:
+            del context['form']
+        context['comments'] = paginate_comments(self.object)
+        return context
 
     def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
         self.object = self.get_object()
-        return super().post(request, *args, **kwargs)
+        form = self.get_form()
+        if form.is_valid():
+            return self.form_valid(form)
+        return self.form_invalid(form)
 
     def form_valid(self, form):
         comment = form.save(commit=False)
@@ -63,19 +96,39 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
-class NewsDetailView(generic.View):
+class NewsComments(generic.DetailView):
+    """Фрагмент со следующей страницей комментариев к новости."""
+    model = News
+    template_name = 'news/includes/comments.html'
 
-    def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+    def get_queryset(self):
+        return self.model.objects.only('pk')
 
-    def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = paginate_comments(
+            self.object, self.request.GET.get('cursor')
+        )
+        return context
+
+
+news_list = conditional_news_page(NewsList.as_view())
+news_detail = conditional_news_page(NewsDetailView.as_view())
+
+
+async def news_list_async(request):
+    """NewsList для ASGI: запросы и шаблон выполняются в пуле news.aio."""
+    return await run_view(news_list, request)
+
+
+async def news_detail_async(request, pk):
+    """NewsDetailView для ASGI, включая отправку комментария."""
+    return await run_view(news_detail, request, pk=pk)
 
 
 class CommentBase(LoginRequiredMixin):
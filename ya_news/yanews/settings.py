@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -18,9 +19,12 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'news.apps.NewsConfig',
+    # Общие шаблоны, например admin/cursor_change_list.html.
+    'yacommon',
 ]
 
 MIDDLEWARE = [
+    'yacommon.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,11 +47,15 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'news.context_processors.fragment_cache',
             ],
         },
     },
 ]
 
+# Компилировать ли шаблоны при запуске, см. warm_up_templates().
+WARM_UP_TEMPLATES = False
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -55,6 +63,17 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Файл тестовой базы для pytest --reuse-db (быстрый режим
+        # run_tests.sh); по умолчанию тестовая база в памяти.
+        'TEST': {'NAME': os.environ.get('DJANGO_TEST_DB_NAME')},
+    }
+}
+
+SQLITE_PRAGMAS = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -80,3 +99,19 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_PAGE = 50
+
+NEWS_CACHE_TIMEOUT = 60 * 60
+
+BAD_WORDS_FILE = BASE_DIR / 'bad_words.txt'
+
+BAD_WORDS_CHECK_INTERVAL = 5
+
+# Асинхронные ленту и страницу новости стоит включать при запуске под ASGI.
+NEWS_ASYNC_VIEWS = False
+# Сколько потоков обслуживают их обращения к базе, см. news.aio.
+NEWS_ASYNC_THREADS = 8
+
+# С каких адресов доступны метрики, см. yacommon.metrics.
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
@@ -0,0 +1,16 @@
+"""
+Настройки для боевого запуска ``yanews``.
+
+DJANGO_SETTINGS_MODULE=yanews.settings_production
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+# Общие боевые значения идут поверх настроек проекта.
+from yacommon.settings_production import (DEBUG, SQLITE_PRAGMAS,  # noqa: F401
+                                          WARM_UP_TEMPLATES, cached_templates,
+                                          persistent_database, shared_cache)
+
+DATABASES = {'default': persistent_database(DATABASES['default'])}
+CACHES = shared_cache(BASE_DIR)
+TEMPLATES = cached_templates(TEMPLATES)
@@ -1,5 +1,74 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ERROR_FLAG
+from django.contrib.auth import get_user_model
+
+from yacommon.admin import CURSOR_VAR, CursorPaginatedAdmin
 
 from .models import Note
+from .search import filter_notes
+
+
+class AuthorIdFilter(admin.SimpleListFilter):
+    """
+    Фильтр по id автора, введённому в поле.
+
+    Обычный фильтр по внешнему ключу выводит в боковой панели всех
+    пользователей; здесь загружается только выбранный автор.
+    """
+    title = 'автору'
+    parameter_name = 'author'
+    placeholder = 'id автора'
+    template = 'admin/input_filter.html'
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        if not self.value() or not self.value().isdigit():
+            return ()
+        return get_user_model().objects.filter(
+            pk=self.value()
+        ).values_list('pk', 'username')
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        if not self.value().isdigit():
+            raise IncorrectLookupParameters
+        return queryset.filter(author_id=self.value())
+
+    def choices(self, changelist):
+        # Остальные параметры списка форма передаёт скрытыми полями.
+        self.hidden_params = [
+            (name, value) for name, value in changelist.params.items()
+            if name not in (self.parameter_name, CURSOR_VAR, ERROR_FLAG)
+        ]
+        yield from super().choices(changelist)
+
+
+@admin.register(Note)
+class NoteAdmin(CursorPaginatedAdmin):
+    list_display = ('title', 'slug', 'author')
+    list_select_related = ('author',)
+    # Фильтр по автору и порядок идут по индексу note_author_id_idx.
+    list_filter = (AuthorIdFilter,)
+    raw_id_fields = ('author',)
+    search_fields = ('title', 'text')
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск по индексу FTS5 вместо LIKE по всей таблице.
 
-admin.site.register(Note)
+        При фильтре по автору совпадения ищутся только среди его заметок.
+        """
+        author_id = request.GET.get(AuthorIdFilter.parameter_name, '')
+        found = filter_notes(
+            queryset, search_term,
+            int(author_id) if author_id.isdigit() else None,
+        )
+        if found is None:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return found, False
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from yacommon.db import apply_sqlite_pragmas
+        from yacommon.warmup import warm_up_if_enabled
+
+        from . import signals  # noqa: F401
+        from .search import register_functions
+        connection_created.connect(apply_sqlite_pragmas)
+        connection_created.connect(register_functions)
+        warm_up_if_enabled()
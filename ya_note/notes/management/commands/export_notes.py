@@ -0,0 +1,54 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает заметки в NDJSON: по объекту '
+        '{"title", "text", "slug", "author"} в строке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки; по умолчанию stdout.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--author', help='Выгрузить только заметки этого пользователя.'
+        )
+
+    def handle(self, *args, **options):
+        notes = Note.objects.order_by('pk')
+        if options['author']:
+            notes = notes.filter(author__username=options['author'])
+        rows = notes.values_list(
+            'title', 'text', 'slug', 'author__username'
+        ).iterator(chunk_size=options['chunk_size'])
+        started = time.perf_counter()
+        if options['path'] == '-':
+            exported = self.export(rows, self.stdout.write)
+        else:
+            with open(options['path'], 'w', encoding='utf-8') as file:
+                exported = self.export(
+                    rows, lambda line: file.write(line + '\n')
+                )
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Выгружено заметок: {exported} за {elapsed:.1f} с '
+            f'({exported / max(elapsed, 1e-9):.0f} строк/с)'
+        )
+
+    def export(self, rows, write_line):
+        exported = 0
+        for title, text, slug, author in rows:
+            write_line(json.dumps(
+                {'title': title, 'text': text, 'slug': slug, 'author': author},
+                ensure_ascii=False,
+            ))
+            exported += 1
+        return exported
@@ -0,0 +1,113 @@
+import random
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from notes.models import Note
+from notes.search import fts_available, index_queryset
+from notes.slugs import SlugAllocator, slugify
+from notes.synthetic import SENTENCES, note_title
+from yacommon.db import insert_rows
+from yacommon.synthetic import (bulk_load, chunked, create_users, text,
+                                zipf_counts)
+
+NOTE_FIELDS = ('title', 'text', 'slug', 'author')
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей и их заметки для нагрузочных '
+        'экспериментов. Число заметок у пользователей распределено по '
+        'закону Ципфа; при одинаковом --seed данные совпадают. Заметки '
+        'вставляются executemany() без объектов моделей и сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument(
+            '--notes-per-user', type=float, default=10,
+            help='Сколько заметок в среднем у пользователя.',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель закона Ципфа; 0 — поровну каждому.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--username-prefix', default='user')
+        parser.add_argument(
+            '--batch-size', type=int, default=20_000,
+            help='Сколько заметок вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--no-index', action='store_true',
+            help='Не добавлять новые заметки в поисковый индекс.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.allocator = SlugAllocator(
+            Note.objects.all(), Note._meta.get_field('slug').max_length
+        )
+        started = time.perf_counter()
+        users = create_users(options['users'], options['username_prefix'])
+        total = round(len(users) * options['notes_per_user'])
+        counts = zipf_counts(total, len(users), options['zipf'], self.rng)
+        created = 0
+        rebuild, indexes = bulk_load(Note, total)
+        self.index = not options['no_index'] and not rebuild
+        with indexes:
+            rows = self.notes(users, counts)
+            for chunk in chunked(rows, options['batch_size']):
+                self.insert(chunk)
+                created += len(chunk)
+                if options['verbosity'] > 1:
+                    self.stderr.write(f'... {created}')
+        if rebuild and not options['no_index'] and fts_available():
+            call_command(
+                'rebuild_notes_index',
+                stdout=self.stdout,
+                verbosity=options['verbosity'],
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(users)}, заметок: {created} '
+            f'за {elapsed:.1f} с '
+            f'({(len(users) + created) / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def notes(self, users, counts):
+        """Заголовок, текст и автор каждой заметки, по авторам подряд."""
+        rng = self.rng
+        max_length = Note._meta.get_field('title').max_length
+        for author_id, count in zip(users, counts):
+            for _ in range(count):
+                yield (
+                    note_title(rng, max_length), text(rng, SENTENCES, 5),
+                    author_id,
+                )
+
+    def insert(self, chunk):
+        bases = [slugify(title) for title, _, _ in chunk]
+        for attempt in (1, 2):
+            slugs = self.allocator.allocate(bases)
+            rows = [
+                (title, note_text, slug, author_id)
+                for (title, note_text, author_id), slug in zip(chunk, slugs)
+            ]
+            try:
+                with transaction.atomic():
+                    last_id = Note.objects.aggregate(last=Max('pk'))['last']
+                    insert_rows(Note, NOTE_FIELDS, rows)
+                    if self.index:
+                        index_queryset(
+                            Note.objects.filter(pk__gt=last_id or 0)
+                        )
+                return
+            except IntegrityError:
+                # Slug заняли параллельно: забываем кеш и подбираем снова.
+                self.allocator.reset()
+                if attempt == 2:
+                    raise
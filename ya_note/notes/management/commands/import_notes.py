@@ -0,0 +1,149 @@
+import json
+import sys
+import time
+from collections import OrderedDict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_slug
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from notes.models import Note
+from notes.search import index_queryset
+from notes.slugs import SQL_PARAMS_LIMIT, SlugAllocator, slugify
+
+User = get_user_model()
+# Сколько авторов держать в кеше id между пачками.
+AUTHORS_CACHE_SIZE = 10_000
+SLUG_MAX_LENGTH = Note._meta.get_field('slug').max_length
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки из NDJSON, как его выгружает export_notes. '
+        'Пустой или занятый slug подбирается заново, '
+        'отсутствующие авторы создаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл с заметками; по умолчанию stdin.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=SQL_PARAMS_LIMIT,
+            help='Сколько заметок вставлять одним bulk_create.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.authors = OrderedDict()
+        self.allocator = SlugAllocator(Note.objects.all(), SLUG_MAX_LENGTH)
+        started = time.perf_counter()
+        if options['path'] == '-':
+            imported = self.load(sys.stdin, options['chunk_size'])
+        else:
+            with open(options['path'], encoding='utf-8') as file:
+                imported = self.load(file, options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено заметок: {imported} за {elapsed:.1f} с '
+            f'({imported / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def load(self, file, chunk_size):
+        rows = (
+            self.parse(number, line)
+            for number, line in enumerate(file, start=1) if line.strip()
+        )
+        imported = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return imported
+            self.insert(chunk)
+            imported += len(chunk)
+            if self.verbosity > 1:
+                self.stderr.write(f'... {imported}')
+
+    def parse(self, number, line):
+        try:
+            row = json.loads(line)
+            slug = row.get('slug')
+            if slug:
+                if not isinstance(slug, str) or len(slug) > SLUG_MAX_LENGTH:
+                    raise ValidationError(f'недопустимый slug {slug!r}')
+                validate_slug(slug)
+            return row['title'], row['text'], slug, row['author']
+        except (ValueError, KeyError, TypeError) as error:
+            raise CommandError(f'Строка {number}: {error!r}')
+        except ValidationError as error:
+            raise CommandError(f'Строка {number}: {"; ".join(error)}')
+
+    def fetch_authors(self, usernames):
+        usernames = list(usernames)
+        found = {}
+        for start in range(0, len(usernames), SQL_PARAMS_LIMIT):
+            found.update(
+                User.objects.filter(
+                    username__in=usernames[start:start + SQL_PARAMS_LIMIT]
+                ).values_list('username', 'pk')
+            )
+        return found
+
+    def resolve_authors(self, usernames):
+        """
+        id авторов пачки; отсутствующие в базе создаются.
+
+        Между пачками помнятся AUTHORS_CACHE_SIZE последних авторов.
+        """
+        usernames = set(usernames)
+        ids = {
+            username: self.authors[username]
+            for username in usernames if username in self.authors
+        }
+        missing = usernames - ids.keys()
+        if missing:
+            ids.update(self.fetch_authors(missing))
+            User.objects.bulk_create(
+                (User(username=username) for username in missing - ids.keys()),
+                batch_size=SQL_PARAMS_LIMIT,
+            )
+            ids.update(self.fetch_authors(missing - ids.keys()))
+        for username, pk in ids.items():
+            self.authors[username] = pk
+            self.authors.move_to_end(username)
+        while len(self.authors) > AUTHORS_CACHE_SIZE:
+            self.authors.popitem(last=False)
+        return ids
+
+    def insert(self, chunk):
+        authors = self.resolve_authors(row[3] for row in chunk)
+        bases = [slug or slugify(title) for title, _, slug, _ in chunk]
+        for attempt in (1, 2):
+            slugs = self.allocator.allocate(bases)
+            notes = [
+                Note(
+                    title=title, text=text, slug=slug,
+                    author_id=authors[author],
+                )
+                for (title, text, _, author), slug in zip(chunk, slugs)
+            ]
+            try:
+                with transaction.atomic():
+                    last_id = (
+                        Note.objects.aggregate(last=Max('pk'))['last'] or 0
+                    )
+                    Note.objects.bulk_create(notes)
+                    # bulk_create не шлёт сигналы и в SQLite не возвращает
+                    # id, индексируем вставленное диапазоном id.
+                    index_queryset(Note.objects.filter(pk__gt=last_id))
+                return
+            except IntegrityError:
+                # Slug заняли параллельно: забываем кеш и подбираем снова.
+                self.allocator.reset()
+                if attempt == 2:
+                    raise
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from notes.search import AUTHOR_WORDS_FUNCTION, FTS_TABLE, fts_available
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс заметок. Индекс '
+        'переписывается диапазонами id, поэтому поиск работает всё время '
+        'перестройки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        chunk_size = options['chunk_size']
+        indexed, last_id = 0, 0
+        with connection.cursor() as cursor:
+            while True:
+                # Диапазон переписывается в своей транзакции: старые
+                # строки удаляются и вставляются заново, остальной
+                # индекс в это время доступен поиску.
+                with transaction.atomic():
+                    cursor.execute(
+                        'SELECT max(id) FROM ('
+                        'SELECT id FROM notes_note WHERE id > %s '
+                        'ORDER BY id LIMIT %s)',
+                        [last_id, chunk_size],
+                    )
+                    next_id = cursor.fetchone()[0]
+                    if next_id is None:
+                        # Строки удалённых заметок за последним id.
+                        cursor.execute(
+                            f'DELETE FROM {FTS_TABLE} WHERE rowid > %s',
+                            [last_id],
+                        )
+                        break
+                    cursor.execute(
+                        f'DELETE FROM {FTS_TABLE} '
+                        'WHERE rowid > %s AND rowid <= %s',
+                        [last_id, next_id],
+                    )
+                    cursor.execute(
+                        f'INSERT INTO {FTS_TABLE} '
+                        '(rowid, title, text, author_words) '
+                        'SELECT id, title, text, '
+                        f'{AUTHOR_WORDS_FUNCTION}(author_id, title, text) '
+                        'FROM notes_note WHERE id > %s AND id <= %s',
+                        [last_id, next_id],
+                    )
+                    indexed += cursor.rowcount
+                    last_id = next_id
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано заметок: {indexed}')
+        )
@@ -0,0 +1,63 @@
+import re
+
+from django.db import migrations
+
+WORD = re.compile(r'[^\W_]+')
+CREATE_SQL = (
+    'CREATE VIRTUAL TABLE notes_note_fts USING fts5('
+    'title, text, author_words, '
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+OLD_CREATE_SQL = (
+    'CREATE VIRTUAL TABLE notes_note_fts USING fts5('
+    "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+)
+FILL_SQL = (
+    'INSERT INTO notes_note_fts (rowid, title, text, author_words) '
+    'SELECT id, title, text, note_author_words(author_id, title, text) '
+    'FROM notes_note'
+)
+OLD_FILL_SQL = (
+    'INSERT INTO notes_note_fts (rowid, title, text) '
+    'SELECT id, title, text FROM notes_note'
+)
+DROP_SQL = 'DROP TABLE IF EXISTS notes_note_fts'
+
+
+def author_words(author_id, title, text):
+    """Копия notes.search.author_words на момент миграции."""
+    return ' '.join(
+        f'{author_id}x{word}' for word in WORD.findall(f'{title} {text}')
+    )
+
+
+def add_author_words(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    connection.ensure_connection()
+    connection.connection.create_function(
+        'note_author_words', 3, author_words, deterministic=True
+    )
+    schema_editor.execute(DROP_SQL)
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+
+
+def remove_author_words(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_SQL)
+    schema_editor.execute(OLD_CREATE_SQL)
+    schema_editor.execute(OLD_FILL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_author_words, remove_author_words),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.db import models
-from pytils.translit import slugify
+
+from .slugs import save_with_unique_slug
 
 
 class Note(models.Model):
@@ -27,11 +28,15 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        return save_with_unique_slug(self, super().save, *args, **kwargs)
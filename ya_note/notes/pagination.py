@@ -0,0 +1,67 @@
+from django.http import Http404
+
+
+class IdPage:
+    """Страница пагинации по первичному ключу."""
+
+    def __init__(self, object_list, next_after=None, previous_before=None):
+        self.object_list = object_list
+        self.next_after = next_after
+        self.previous_before = previous_before
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_after is not None
+
+    def has_previous(self):
+        return self.previous_before is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class IdCursorPaginationMixin:
+    """
+    Курсорная пагинация ListView по id.
+
+    ?after=<id> — страница после записи, ?before=<id> — перед ней.
+    В отличие от OFFSET стоимость любой страницы одинакова, если
+    есть индекс, начинающийся с фильтров queryset и заканчивающийся id.
+    """
+
+    def get_cursor(self, name):
+        value = self.request.GET.get(name)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise Http404('Некорректный курсор.')
+
+    def paginate_queryset(self, queryset, page_size):
+        before = self.get_cursor('before')
+        if before is not None:
+            rows = list(
+                queryset.filter(pk__lt=before).order_by('-pk')[:page_size + 1]
+            )
+            has_previous, has_next = len(rows) > page_size, True
+            rows = rows[:page_size][::-1]
+        else:
+            after = self.get_cursor('after')
+            queryset = queryset.order_by('pk')
+            if after is not None:
+                queryset = queryset.filter(pk__gt=after)
+            rows = list(queryset[:page_size + 1])
+            has_previous, has_next = after is not None, len(rows) > page_size
+            rows = rows[:page_size]
+        page = IdPage(
+            rows,
+            next_after=rows[-1].pk if rows and has_next else None,
+            previous_before=rows[0].pk if rows and has_previous else None,
+        )
+        return None, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,143 @@
+import re
+
+from django.db import connection
+from django.db.models import F, Func, Q, TextField
+from django.db.models.expressions import RawSQL
+
+from .models import Note
+
+FTS_TABLE = 'notes_note_fts'
+# Слова в понимании токенизатора unicode61: подчёркивание — разделитель.
+WORD = re.compile(r'[^\W_]+')
+AUTHOR_WORDS_FUNCTION = 'note_author_words'
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def author_words(author_id, *texts):
+    """
+    Слова текстов с префиксом автора: «17xслово».
+
+    Колонка author_words индекса хранит такие слова, и MATCH по ней
+    сразу отбирает только заметки автора: время поиска зависит от
+    числа его заметок, а не от того, сколько совпадений у остальных.
+    """
+    return ' '.join(
+        f'{author_id}x{word}' for text in texts for word in WORD.findall(text)
+    )
+
+
+def register_functions(sender, connection, **kwargs):
+    """Добавляет author_words() в SQL каждого нового соединения SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    connection.connection.create_function(
+        AUTHOR_WORDS_FUNCTION, 3, author_words, deterministic=True
+    )
+
+
+def build_match_query(text, author_id=None):
+    """
+    Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки и ищется как префикс, слова
+    объединяются через AND; синтаксис FTS5 из ввода не проходит.
+    С author_id слова ищутся только среди заметок этого автора.
+    """
+    words = WORD.findall(text)
+    if not words:
+        return ''
+    if author_id is None:
+        return ' '.join(f'"{word}"*' for word in words)
+    return 'author_words : ({})'.format(
+        ' '.join(f'"{author_id}x{word}"*' for word in words)
+    )
+
+
+def index_note(note):
+    """Добавляет или обновляет заметку в поисковом индексе."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [note.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text, author_words) '
+            'VALUES (%s, %s, %s, %s)',
+            [
+                note.pk, note.title, note.text,
+                author_words(note.author_id, note.title, note.text),
+            ],
+        )
+
+
+def unindex_note(note_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [note_id])
+
+
+def index_queryset(queryset):
+    """
+    Индексирует заметки queryset одним INSERT ... SELECT.
+
+    Нужен там, где сигналы не срабатывают: после bulk_create.
+    """
+    if not fts_available():
+        return
+    sql, params = queryset.order_by().values_list(
+        'id', 'title', 'text',
+        Func(
+            F('author_id'), F('title'), F('text'),
+            function=AUTHOR_WORDS_FUNCTION, output_field=TextField(),
+        ),
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+            f'(SELECT id FROM ({sql}))',
+            params,
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text, author_words) '
+            f'{sql}',
+            params,
+        )
+
+
+def search_notes(user, text, limit):
+    """Заметки пользователя, подходящие под text, лучшие первыми."""
+    match_query = build_match_query(text, user.pk)
+    if not match_query:
+        return []
+    if not fts_available():
+        return list(
+            Note.objects.filter(author=user)
+            .filter(Q(title__icontains=text) | Q(text__icontains=text))
+            .only('id', 'slug', 'title')[:limit]
+        )
+    return list(Note.objects.raw(
+        'SELECT note.id, note.slug, note.title '
+        f'FROM {FTS_TABLE} '
+        f'JOIN notes_note AS note ON note.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s AND note.author_id = %s '
+        f'ORDER BY {FTS_TABLE}.rank LIMIT %s',
+        [match_query, user.pk, limit],
+    ))
+
+
+def filter_notes(queryset, text, author_id=None):
+    """
+    Заметки queryset, подходящие под text; None без индекса FTS5.
+
+    С author_id совпадения ищутся только среди заметок этого автора.
+    """
+    match_query = build_match_query(text, author_id)
+    if not match_query or not fts_available():
+        return None
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [match_query],
+    ))
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Note
+from .search import index_note, unindex_note
+
+
+@receiver(post_save, sender=Note)
+def update_search_index(sender, instance, **kwargs):
+    """Сохранённая заметка сразу попадает в поисковый индекс."""
+    index_note(instance)
+
+
+@receiver(post_delete, sender=Note)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_note(instance.pk)
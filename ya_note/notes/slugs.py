@@ -0,0 +1,195 @@
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.db import IntegrityError, transaction
+from pytils import translit
+
+from yacommon.db import SQL_PARAMS_LIMIT
+
+# Место под суффикс вида «-12345» при обрезке длинных slug.
+SUFFIX_RESERVE = 8
+DEFAULT_SLUG = 'note'
+SAVE_ATTEMPTS = 5
+SLUGIFY_CACHE_SIZE = 4096
+SUFFIX_PATTERN = re.compile(r'(.+)-(\d+)')
+# Больше любого символа: верхняя граница диапазона строк с префиксом.
+MAX_CHAR = chr(0x10FFFF)
+
+
+def with_slug_prefix(queryset, prefix):
+    """
+    Объекты queryset, чей slug начинается с prefix.
+
+    slug__startswith в SQLite превращается в LIKE, который не может
+    искать по уникальному индексу slug и просматривает его целиком.
+    Диапазон prefix <= slug < prefix + MAX_CHAR индекс использует.
+    """
+    return queryset.filter(slug__gte=prefix, slug__lt=prefix + MAX_CHAR)
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def slugify(title):
+    """
+    pytils.translit.slugify с LRU-кешем.
+
+    Транслитерация заметна в профиле массового импорта, а одинаковые
+    заголовки встречаются часто. Счётчики попаданий и промахов
+    доступны через slugify.cache_info().
+    """
+    return translit.slugify(title)
+
+
+def slug_taken(queryset, slug, exclude_pk=None):
+    """Занят ли slug другим объектом queryset."""
+    taken = queryset.filter(slug=slug)
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    return taken.exists()
+
+
+def allocate_slug(queryset, base, max_length, exclude_pk=None):
+    """
+    Подбирает свободный slug: base, base-2, base-3 и так далее.
+
+    Все занятые варианты забираются одним запросом по префиксу,
+    дальше свободный номер ищется в памяти.
+    """
+    base = base[:max_length] or DEFAULT_SLUG
+    prefix = base[:max_length - SUFFIX_RESERVE]
+    taken = with_slug_prefix(queryset, prefix)
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    taken = set(taken.values_list('slug', flat=True))
+    if base not in taken:
+        return base
+    number = 2
+    while True:
+        suffix = f'-{number}'
+        slug = base[:max_length - len(suffix)] + suffix
+        if slug not in taken:
+            return slug
+        number += 1
+
+
+def save_with_unique_slug(instance, save, *args, **kwargs):
+    """
+    Сохраняет instance, подобрав ему свободный slug из заголовка.
+
+    Между подбором и вставкой slug может занять параллельный запрос:
+    тогда база отвечает IntegrityError, и подбор повторяется. Прочие
+    нарушения целостности пробрасываются сразу.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field('slug').max_length
+    base = slugify(instance.title)
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        instance.slug = allocate_slug(
+            model._default_manager.all(), base, max_length, instance.pk
+        )
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            conflict = slug_taken(
+                model._default_manager.all(), instance.slug, instance.pk
+            )
+            instance.slug = ''
+            if not conflict or attempt == SAVE_ATTEMPTS:
+                raise
+
+
+class SlugAllocator:
+    """
+    Подбор slug для пачек заметок при массовом импорте.
+
+    Для каждой основы запоминается последний выданный номер, поэтому
+    частые заголовки не требуют повторных запросов. Свободные основы
+    проверяются одним запросом slug IN (...) на пачку, и только для
+    занятых основ выполняется запрос по префиксу. Память ограничена
+    cache_size основами. Если slug параллельно занял кто-то ещё,
+    bulk_create упадёт с IntegrityError: тогда вызовите reset()
+    и подберите slug для пачки заново.
+    """
+
+    def __init__(self, queryset, max_length, cache_size=10_000):
+        self.queryset = queryset
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self._last_numbers = OrderedDict()
+
+    def reset(self):
+        self._last_numbers.clear()
+
+    def _make_slug(self, base, number):
+        if number == 1:
+            return base
+        suffix = f'-{number}'
+        return base[:self.max_length - len(suffix)] + suffix
+
+    def _suffix_number(self, slug, base):
+        if slug == base:
+            return 1
+        match = SUFFIX_PATTERN.fullmatch(slug)
+        if match is None:
+            return 0
+        number = int(match.group(2))
+        return number if self._make_slug(base, number) == slug else 0
+
+    def _last_taken_number(self, base):
+        prefix = base[:self.max_length - SUFFIX_RESERVE]
+        slugs = with_slug_prefix(self.queryset, prefix).values_list(
+            'slug', flat=True
+        )
+        return max(
+            (self._suffix_number(slug, base) for slug in slugs), default=0
+        )
+
+    def _remember(self, base, number):
+        self._last_numbers[base] = number
+        self._last_numbers.move_to_end(base)
+        if len(self._last_numbers) > self.cache_size:
+            self._last_numbers.popitem(last=False)
+
+    def allocate(self, bases):
+        """Список свободных slug для основ bases, в том же порядке."""
+        bases = [base[:self.max_length] or DEFAULT_SLUG for base in bases]
+        numbers = {
+            base: self._last_numbers[base]
+            for base in set(bases) if base in self._last_numbers
+        }
+        unknown = list(set(bases) - numbers.keys())
+        taken = set()
+        for start in range(0, len(unknown), SQL_PARAMS_LIMIT):
+            taken.update(
+                self.queryset.filter(
+                    slug__in=unknown[start:start + SQL_PARAMS_LIMIT]
+                ).values_list('slug', flat=True)
+            )
+        # Основы, чьи варианты base-N в базе ещё не проверялись.
+        unchecked = set()
+        for base in unknown:
+            if base in taken:
+                numbers[base] = self._last_taken_number(base)
+            else:
+                numbers[base] = 0
+                unchecked.add(base)
+        # Основа одной строки может совпасть со slug, выданным другой
+        # строке пачки: «x», «x» и явный «x-2» дают x, x-2, x-2-2.
+        issued = set()
+        slugs = []
+        for base in bases:
+            number = numbers[base] + 1
+            if number > 1 and base in unchecked:
+                unchecked.discard(base)
+                number = max(number, self._last_taken_number(base) + 1)
+            slug = self._make_slug(base, number)
+            while slug in issued:
+                number += 1
+                slug = self._make_slug(base, number)
+            numbers[base] = number
+            issued.add(slug)
+            slugs.append(slug)
+        for base, number in numbers.items():
+            self._remember(base, number)
+        return slugs
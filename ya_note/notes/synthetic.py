@@ -0,0 +1,25 @@
+# Словари для правдоподобных заголовков и текстов заметок.
+NOTE_TITLES = (
+    'Список покупок на {}', 'План на {}', 'Идеи про {}',
+    'Конспект про {}', 'Что почитать про {}',
+    'Вопросы к встрече про {}', 'Мысли про {}',
+)
+NOTE_TOPICS = (
+    'выходные', 'отпуск', 'понедельник', 'борщ', 'ремонт', 'сад',
+    'английский', 'квартальный отчёт', 'день рождения', 'переезд',
+    'тренировки', 'дачу', 'алгоритмы', 'историю Рима', 'новый проект',
+    'подарки', 'путешествие на Байкал', 'курсы Python',
+)
+SENTENCES = (
+    'Не забыть купить хлеб и молоко.', 'Позвонить маме в субботу.',
+    'Перечитать главу перед экзаменом.', 'Записаться к врачу.',
+    'Уточнить сроки у коллег.', 'Взять с собой зарядку.',
+    'Сначала сделать самое срочное.', 'Обсудить это на встрече.',
+    'Проверить, что ничего не забыто.', 'Вернуться к этому через неделю.',
+)
+
+
+def note_title(rng, max_length):
+    return rng.choice(NOTE_TITLES).format(rng.choice(NOTE_TOPICS))[
+        :max_length
+    ]
@@ -0,0 +1,19 @@
+import pytest
+from django.db import connection
+
+from notes.search import FTS_TABLE
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """
+    Возвращает сохранённую базу (--reuse-db) к виду только что созданной.
+
+    TransactionTestCase очищает таблицы моделей, но не счётчики
+    AUTOINCREMENT и не поисковый индекс, и в следующем запуске его
+    строки достались бы новым заметкам с теми же id.
+    """
+    if connection.vendor == 'sqlite':
+        with django_db_blocker.unblock(), connection.cursor() as cursor:
+            cursor.execute('DELETE FROM sqlite_sequence')
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.admin import NoteAdmin
+from notes.models import Note
+from yacommon.db import estimated_row_count
+
+User = get_user_model()
+
+CHANGELIST = reverse('admin:notes_note_changelist')
+
+
+class TestNoteAdmin(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('Админ', password='x')
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Рецепт борща', text='Свёкла', author=cls.author
+        )
+        cls.other = Note.objects.create(
+            title='Список дел', text='Купить хлеб', author=cls.admin
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def get_changelist(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(CHANGELIST, params)
+        return response.context['cl'], [query['sql'] for query in context]
+
+    def test_full_list_is_not_counted(self):
+        changelist, queries = self.get_changelist()
+        self.assertEqual(changelist.result_count, self.other.pk)
+        self.assertIsNone(changelist.full_result_count)
+        self.assertFalse([
+            sql for sql in queries
+            if 'COUNT(' in sql and 'notes_note' in sql
+        ])
+
+    def test_pages_by_cursor(self):
+        notes = [self.other, self.note] + [
+            Note.objects.create(title=f'Заметка {index}', text='Текст',
+                                author=self.author)
+            for index in range(3)
+        ]
+        expected = sorted(notes, key=lambda note: note.pk, reverse=True)
+        seen = []
+        params = {}
+        with mock.patch.object(NoteAdmin, 'list_per_page', 2):
+            while True:
+                changelist, queries = self.get_changelist(**params)
+                self.assertFalse([sql for sql in queries if 'OFFSET' in sql])
+                seen.extend(changelist.result_list)
+                if not changelist.page.has_next():
+                    break
+                params = {'cursor': changelist.page.next_cursor}
+        self.assertEqual(seen, expected)
+
+    def test_author_filter(self):
+        changelist, _ = self.get_changelist(author=self.author.pk)
+        self.assertEqual(list(changelist.result_list), [self.note])
+        self.assertEqual(changelist.result_count, 1)
+
+    def test_author_filter_does_not_list_users(self):
+        User.objects.bulk_create(
+            User(username=f'Пользователь {index}') for index in range(50)
+        )
+        response = self.client.get(CHANGELIST, {'q': 'борщ'})
+        self.assertNotContains(response, 'Пользователь 1')
+        self.assertContains(
+            response, '<input type="hidden" name="q" value="борщ">'
+        )
+        response = self.client.get(CHANGELIST, {'author': self.author.pk})
+        self.assertContains(response, f'title="{self.author.username}"')
+        self.assertNotContains(response, 'Пользователь 1')
+
+    def test_author_filter_rejects_bad_id(self):
+        response = self.client.get(CHANGELIST, {'author': 'abc'})
+        self.assertRedirects(response, f'{CHANGELIST}?e=1')
+
+    def test_search_uses_fts_index(self):
+        changelist, queries = self.get_changelist(q='борщ')
+        self.assertEqual(list(changelist.result_list), [self.note])
+        self.assertTrue(any('MATCH' in sql for sql in queries))
+        self.assertFalse(any('LIKE' in sql for sql in queries))
+
+    def test_search_within_author(self):
+        for author, expected in ((self.author, [self.note]), (self.admin, [])):
+            with self.subTest(author=author):
+                changelist, queries = self.get_changelist(
+                    q='борщ', author=author.pk
+                )
+                self.assertEqual(list(changelist.result_list), expected)
+                self.assertTrue(
+                    any(f'{author.pk}x' in sql for sql in queries)
+                )
+
+
+class TestEstimatedRowCount(TestCase):
+
+    def test_estimate_from_statistics(self):
+        author = User.objects.create(username='Автор')
+        notes = [
+            Note.objects.create(title=f'Заметка {i}', text='Текст',
+                                author=author)
+            for i in range(3)
+        ]
+        notes[0].delete()
+        # Без статистики — наибольший id.
+        self.assertEqual(estimated_row_count(Note), notes[-1].pk)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimated_row_count(Note), 2)
@@ -0,0 +1,233 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from notes.management.commands import import_notes
+from notes.models import Note
+from notes.search import FTS_TABLE, search_notes
+from notes.slugs import SlugAllocator
+
+User = get_user_model()
+
+
+class TestImportExportNotes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        for index in range(3):
+            Note.objects.create(
+                title='Повтор', text=f'Текст {index}', author=cls.author
+            )
+
+    def write(self, directory, rows):
+        path = Path(directory) / 'notes.ndjson'
+        path.write_text(
+            '\n'.join(json.dumps(row) for row in rows), encoding='utf-8'
+        )
+        return str(path)
+
+    def export(self):
+        output = StringIO()
+        call_command('export_notes', stdout=output, stderr=StringIO())
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_export_streams_ndjson(self):
+        rows = self.export()
+        self.assertEqual(
+            [row['slug'] for row in rows], ['povtor', 'povtor-2', 'povtor-3']
+        )
+        self.assertEqual({row['author'] for row in rows}, {'Автор'})
+
+    def test_round_trip_allocates_free_slugs(self):
+        rows = self.export()
+        rows.append({'title': 'Повтор', 'text': 'Новая', 'author': 'Гость'})
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                'import_notes', self.write(directory, rows),
+                chunk_size=2, stdout=StringIO(),
+            )
+        self.assertEqual(Note.objects.count(), 7)
+        slugs = list(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(len(set(slugs)), len(slugs))
+        self.assertIn('povtor-2-2', slugs)
+        self.assertIn('povtor-5', slugs)
+        self.assertTrue(
+            Note.objects.filter(author__username='Гость').exists()
+        )
+
+        self.assertEqual(
+            len(search_notes(self.author, 'новая', limit=10)), 0
+        )
+        guest = User.objects.get(username='Гость')
+        self.assertEqual(len(search_notes(guest, 'новая', limit=10)), 1)
+
+    def test_chunk_slugs_do_not_collide(self):
+        rows = [
+            {'title': 'X', 'text': 'Первая', 'author': 'Гость'},
+            {'title': 'X', 'text': 'Вторая', 'author': 'Гость'},
+            {'title': 'Явная', 'text': 'Третья', 'author': 'Гость',
+             'slug': 'x-2'},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                'import_notes', self.write(directory, rows),
+                chunk_size=3, stdout=StringIO(),
+            )
+        self.assertEqual(
+            list(Note.objects.filter(author__username='Гость')
+                 .order_by('pk').values_list('slug', flat=True)),
+            ['x', 'x-2', 'x-2-2'],
+        )
+
+    def test_invalid_slug_is_rejected(self):
+        for slug in ('с пробелом', 'a/b', 'x' * 101, 5):
+            rows = [
+                {'title': 'A', 'text': 'Первая', 'author': 'Гость'},
+                {'title': 'B', 'text': 'Вторая', 'author': 'Гость',
+                 'slug': slug},
+            ]
+            with self.subTest(slug=slug):
+                with tempfile.TemporaryDirectory() as directory:
+                    with self.assertRaisesRegex(CommandError, 'Строка 2'):
+                        call_command(
+                            'import_notes', self.write(directory, rows),
+                            stdout=StringIO(),
+                        )
+                self.assertEqual(Note.objects.count(), 3)
+
+    def test_inserted_notes_indexed_by_id(self):
+        rows = [
+            {'title': f'Заметка {index}', 'text': 'Импорт',
+             'author': 'Гость'}
+            for index in range(5)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            with CaptureQueriesContext(connection) as context:
+                call_command(
+                    'import_notes', self.write(directory, rows),
+                    stdout=StringIO(),
+                )
+        for query in context:
+            if FTS_TABLE in query['sql']:
+                self.assertNotIn('"slug" IN', query['sql'])
+        guest = User.objects.get(username='Гость')
+        self.assertEqual(len(search_notes(guest, 'импорт', limit=10)), 5)
+
+    def test_authors_cache_is_bounded(self):
+        rows = [
+            {'title': 'A', 'text': 'Текст', 'author': f'user{index % 4}'}
+            for index in range(8)
+        ] + [{'title': 'A', 'text': 'Текст', 'author': 'Автор'}]
+        command = import_notes.Command()
+        with mock.patch.object(import_notes, 'AUTHORS_CACHE_SIZE', 2):
+            with tempfile.TemporaryDirectory() as directory:
+                call_command(
+                    command, self.write(directory, rows),
+                    chunk_size=3, stdout=StringIO(),
+                )
+        self.assertLessEqual(len(command.authors), 2)
+        self.assertEqual(
+            list(Note.objects.order_by('pk')[3:].values_list(
+                'author__username', flat=True
+            )),
+            [row['author'] for row in rows],
+        )
+
+    def test_numbered_slug_taken_in_database_is_skipped(self):
+        Note.objects.create(
+            title='Y', text='Текст', slug='y-2', author=self.author
+        )
+        allocator = SlugAllocator(Note.objects.all(), 100)
+        self.assertEqual(allocator.allocate(['y', 'y']), ['y', 'y-3'])
+
+
+class TestRebuildNotesIndex(TestCase):
+
+    def test_rebuild_restores_index(self):
+        author = User.objects.create(username='Автор')
+        notes = [
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', author=author
+            )
+            for index in range(5)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(search_notes(author, 'заметка', limit=10), [])
+        call_command('rebuild_notes_index', chunk_size=2, stdout=StringIO())
+        self.assertEqual(
+            sorted(search_notes(author, 'заметка', limit=10),
+                   key=lambda note: note.pk),
+            notes,
+        )
+
+    def test_rebuild_replaces_ranges(self):
+        author = User.objects.create(username='Автор')
+        note = Note.objects.create(
+            title='Заметка', text='Текст', author=author
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {FTS_TABLE} SET author_words = %s WHERE rowid = %s',
+                [f'{author.pk}xустарело', note.pk],
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text, author_words) '
+                "VALUES (%s, 'Удалённая', '', %s)",
+                [note.pk + 10, f'{author.pk}xудалённая'],
+            )
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'rebuild_notes_index', chunk_size=1, stdout=StringIO()
+            )
+        # Индекс не очищается целиком: поиск работает во время перестройки.
+        for query in context:
+            if query['sql'].startswith(f'DELETE FROM {FTS_TABLE}'):
+                self.assertIn('WHERE rowid', query['sql'])
+        self.assertEqual(search_notes(author, 'устарело', limit=10), [])
+        self.assertEqual(search_notes(author, 'удалённая', limit=10), [])
+        self.assertEqual(search_notes(author, 'заметка', limit=10), [note])
+
+
+class TestGenerateData(TestCase):
+
+    def generate(self, **options):
+        options = {'users': 4, 'notes_per_user': 5, 'seed': 7, **options}
+        call_command('generate_data', stdout=StringIO(), **options)
+        return list(Note.objects.order_by('pk').values_list(
+            'title', 'text', 'slug', 'author__username'
+        ))
+
+    def fts_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+            return cursor.fetchone()[0]
+
+    def test_generate_is_reproducible(self):
+        notes = self.generate()
+        self.assertEqual(len(notes), 20)
+        self.assertEqual(len({slug for _, _, slug, _ in notes}), 20)
+        self.assertEqual(self.fts_count(), 20)
+        Note.objects.all().delete()
+        self.assertEqual(self.generate(), notes)
+
+    def test_generate_adds_to_existing_notes(self):
+        first = self.generate()
+        added = self.generate(
+            users=2, notes_per_user=3, zipf=0, username_prefix='new'
+        )[len(first):]
+        self.assertEqual(
+            sorted(author for *_, author in added),
+            ['new0'] * 3 + ['new1'] * 3,
+        )
+        self.assertEqual(Note.objects.values('slug').distinct().count(), 26)
+        self.assertEqual(self.fts_count(), 26)
@@ -1,9 +1,16 @@
+from http import HTTPStatus
+
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection
+from django.template import engines
+from django.test import Client, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
 from notes.models import Note
 from notes.forms import NoteForm
+from yacommon.metrics import CONTENT_TYPE, REGISTRY
+from yacommon.warmup import warm_up_templates
+from yanote.settings_production import TEMPLATES
 
 User = get_user_model()
 
@@ -39,6 +46,29 @@ class TestNotesListPage(TestCase):
                 object_list = response.context['object_list']
                 self.assertEqual((self.first_note in object_list), status)
 
+    @override_settings(NOTES_COUNT_ON_PAGE=2)
+    def test_notes_list_is_paginated_by_id(self):
+        notes = [self.first_note] + [
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст',
+                author=self.first_author,
+            )
+            for index in range(2)
+        ]
+        first_page = self.first_client.get(self.list_url).context['page_obj']
+        self.assertEqual(list(first_page), notes[:2])
+        self.assertNotIn('text', first_page.object_list[0].__dict__)
+        response = self.first_client.get(
+            self.list_url, {'after': first_page.next_after}
+        )
+        second_page = response.context['page_obj']
+        self.assertEqual(list(second_page), notes[2:])
+        self.assertFalse(second_page.has_next())
+        response = self.first_client.get(
+            self.list_url, {'before': second_page.previous_before}
+        )
+        self.assertEqual(list(response.context['object_list']), notes[:2])
+
 
 class TestDetailPage(TestCase):
     @classmethod
@@ -62,3 +92,95 @@ class TestDetailPage(TestCase):
                 response = self.author_client.get(name)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestSearchPage(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader = User.objects.create(username='Читатель')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.note = Note.objects.create(
+            title='Рецепт борща',
+            text='Свёкла, капуста и немного терпения',
+            author=cls.author,
+        )
+        cls.search_url = reverse('notes:search')
+
+    def search(self, client, query):
+        response = client.get(self.search_url, {'q': query})
+        return list(response.context['object_list'])
+
+    def test_search_finds_own_notes_only(self):
+        for client, query, expected in (
+            (self.author_client, 'борщ', [self.note]),
+            (self.author_client, 'КАПУСТ', [self.note]),
+            (self.author_client, 'рецепт "(', [self.note]),
+            (self.author_client, 'пельмени', []),
+            (self.reader_client, 'борщ', []),
+        ):
+            with self.subTest(client=client, query=query):
+                self.assertEqual(self.search(client, query), expected)
+
+    def test_index_follows_edit_and_delete(self):
+        self.note.title = 'Рецепт пельменей'
+        self.note.save()
+        self.assertEqual(self.search(self.author_client, 'пельмени'), [])
+        self.assertEqual(
+            self.search(self.author_client, 'пельмен'), [self.note]
+        )
+        self.assertEqual(self.search(self.author_client, 'борщ'), [])
+        self.note.delete()
+        self.assertEqual(self.search(self.author_client, 'пельмен'), [])
+
+
+class TestTemplatesWarmUp(SimpleTestCase):
+
+    @override_settings(TEMPLATES=TEMPLATES)
+    def test_warm_up_fills_template_cache(self):
+        timings = warm_up_templates()
+        self.assertLessEqual(
+            {'base.html', 'includes/header.html', 'notes/list.html',
+             'notes/detail.html'},
+            set(timings),
+        )
+        loader, = engines['django'].engine.template_loaders
+        self.assertLessEqual(set(timings), set(loader.get_template_cache))
+
+
+class TestMetrics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.create(title='Заметка', text='Текст', author=cls.author)
+
+    def setUp(self):
+        REGISTRY.reset()
+        self.client.force_login(self.author)
+
+    def test_metrics_are_exported(self):
+        queries = []
+        with connection.execute_wrapper(
+            lambda execute, sql, *args: queries.append(sql)
+            or execute(sql, *args)
+        ):
+            self.client.get(reverse('notes:list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        content = response.content.decode()
+        for line in (
+            f'http_request_db_queries_sum{{view="notes:list"}} '
+            f'{len(queries)}',
+            'http_request_duration_seconds_count{view="notes:list"} 1',
+            'http_request_template_duration_seconds_bucket'
+            '{view="notes:list",le="+Inf"} 1',
+        ):
+            with self.subTest(line=line):
+                self.assertIn(line, content)
+
+    def test_metrics_are_local_only(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -1,12 +1,18 @@
 from http import HTTPStatus
+from threading import Thread
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import IntegrityError, OperationalError, connection
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
 from django.urls import reverse
 from pytils.translit import slugify
 
-from notes.forms import WARNING
+from notes import slugs
+from notes.forms import WARNING, NoteForm
 from notes.models import Note
+from yacommon.db import apply_sqlite_pragmas
 
 User = get_user_model()
 
@@ -42,16 +48,16 @@ class TestCommentCreation(TestCase):
         self.assertEqual(note.author, self.user)
 
     def test_user_cant_create_note_with_used_slug(self):
-        response = self.auth_client.post(self.url, data=self.form_data)
-        expected_slug = slugify(self.form_data['title'])
+        form_data = {**self.form_data, 'slug': 'used-slug'}
+        response = self.auth_client.post(self.url, data=form_data)
         self.assertRedirects(response, self.url_success)
         notes_count = Note.objects.count()
         self.assertEqual(notes_count, 1)
         self.assertFormError(
-            self.auth_client.post(self.url, data=self.form_data),
+            self.auth_client.post(self.url, data=form_data),
             form='form',
             field='slug',
-            errors=(expected_slug + WARNING),
+            errors=(form_data['slug'] + WARNING),
             msg_prefix=(
                 f'Убедитесь, что форма создания заметки, возвращает '
                 f'ошибку "{WARNING}" при попытке создать заметку с '
@@ -59,6 +65,133 @@ class TestCommentCreation(TestCase):
             ),
         )
 
+    def test_empty_slug_gets_free_suffix(self):
+        expected_slug = slugify(self.form_data['title'])
+        for _ in range(3):
+            response = self.auth_client.post(self.url, data=self.form_data)
+            self.assertRedirects(response, self.url_success)
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            [expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'],
+        )
+
+    def test_slug_taken_between_lookup_and_insert(self):
+        taken = Note.objects.create(
+            title=self.NOTES_TITLE, text=self.NOTES_TEXT, author=self.user
+        )
+        real_allocate = slugs.allocate_slug
+
+        def stale_first_time(*args):
+            # Первый подбор «не видит» параллельно созданную заметку.
+            if allocate.call_count == 1:
+                return taken.slug
+            return real_allocate(*args)
+
+        with mock.patch.object(
+            slugs, 'allocate_slug', side_effect=stale_first_time
+        ) as allocate:
+            note = Note.objects.create(
+                title=self.NOTES_TITLE, text=self.NOTES_TEXT, author=self.user
+            )
+        self.assertEqual(allocate.call_count, 2)
+        self.assertEqual(note.slug, f'{taken.slug}-2')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        save = mock.Mock(
+            side_effect=IntegrityError('NOT NULL constraint failed')
+        )
+        note = Note(title=self.NOTES_TITLE, author=self.user)
+        with self.assertRaises(IntegrityError):
+            slugs.save_with_unique_slug(note, save)
+        self.assertEqual(save.call_count, 1)
+
+    def test_slug_taken_after_form_check(self):
+        form_data = {**self.form_data, 'slug': 'used-slug'}
+        Note.objects.create(
+            title='Другая', text='Текст', slug='used-slug', author=self.user
+        )
+        # Проверки формы прошли до того, как slug заняли.
+        with mock.patch.object(
+            NoteForm, 'clean_slug', return_value='used-slug'
+        ), mock.patch.object(NoteForm, 'validate_unique'):
+            response = self.auth_client.post(self.url, data=form_data)
+        self.assertFormError(
+            response, 'form', 'slug', 'used-slug' + WARNING
+        )
+
+    def test_view_reraises_other_integrity_errors(self):
+        form_data = {**self.form_data, 'slug': 'free-slug'}
+        with mock.patch.object(
+            Note, 'save', side_effect=IntegrityError('CHECK constraint failed')
+        ):
+            with self.assertRaises(IntegrityError):
+                self.auth_client.post(self.url, data=form_data)
+
+    def test_slugify_is_memoized(self):
+        title = 'Заголовок для кеша транслитерации'
+        slugs.slugify.cache_clear()
+        for _ in range(2):
+            Note.objects.create(title=title, text='Текст', author=self.user)
+        cache_info = slugs.slugify.cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses), (1, 1))
+        self.assertEqual(slugs.slugify(title), slugify(title))
+
+
+class TestConcurrentSlugAllocation(TransactionTestCase):
+
+    THREADS = 4
+    NOTES_PER_THREAD = 10
+
+    def create_note(self, author):
+        # Тестовая SQLite в памяти блокирует таблицу целиком и не
+        # ждёт освобождения, поэтому такую блокировку просто повторяем.
+        while True:
+            try:
+                return Note.objects.create(
+                    title='Одинаковый заголовок', text='Текст', author=author
+                )
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+
+    def create_notes(self, author, errors):
+        try:
+            for _ in range(self.NOTES_PER_THREAD):
+                self.create_note(author)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_concurrent_creates_get_unique_slugs(self):
+        author = User.objects.create(username='Многопоточный автор')
+        errors = []
+        threads = [
+            Thread(target=self.create_notes, args=(author, errors))
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        note_slugs = list(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(
+            len(note_slugs), self.THREADS * self.NOTES_PER_THREAD
+        )
+        self.assertEqual(len(set(note_slugs)), len(note_slugs))
+
+
+class TestSqlitePragmas(TestCase):
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4096})
+    def test_pragmas_are_applied(self):
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cache_size = cursor.execute('PRAGMA cache_size').fetchone()
+            cursor.execute('PRAGMA cache_size = -2000')
+        self.assertEqual(cache_size, (-4096,))
+
 
 class TestNoteAddEditDelete(TestCase):
 
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.search import (FTS_TABLE, build_match_query, index_queryset,
+                          search_notes)
+from notes.slugs import SlugAllocator, allocate_slug
+
+User = get_user_model()
+
+NOTES_COUNT = 500
+SEARCH_AUTHORS = 20
+NOTES_PER_SEARCH_AUTHOR = 25
+
+
+class TestQueryBudget(TestCase):
+    """
+    Число запросов страницы не зависит от числа заметок.
+
+    Если оно выросло, скорее всего, в шаблон или представление
+    пробрался запрос на каждую заметку.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Плодовитый автор')
+        cls.reader = User.objects.create(username='Читатель')
+        for author in (cls.author, cls.reader):
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка {i}',
+                    text='Текст',
+                    slug=f'{author.pk}-{i}',
+                    author=author,
+                )
+                for i in range(NOTES_COUNT)
+            )
+        cls.note = Note.objects.filter(author=cls.author).last()
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def assertMaxNumQueries(self, budget, url):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        queries = '\n'.join(query['sql'] for query in context)
+        self.assertLessEqual(
+            len(context), budget,
+            f'{url}: {len(context)} запросов при бюджете {budget}:\n{queries}',
+        )
+
+    def test_query_budget(self):
+        for name, args, budget in (
+            ('notes:list', None, 3),
+            ('notes:detail', (self.note.slug,), 3),
+            ('notes:edit', (self.note.slug,), 3),
+            ('notes:delete', (self.note.slug,), 3),
+        ):
+            with self.subTest(name=name):
+                self.assertMaxNumQueries(budget, reverse(name, args=args))
+
+
+class TestSlugLookups(TestCase):
+    """Подбор slug ищет занятые варианты по индексу, а не перебором."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username='Автор')
+        Note.objects.bulk_create(
+            Note(title='План', text='Текст', slug=slug, author=author)
+            for slug in ('plan', 'plan-2', 'plan-zavtra')
+        )
+
+    def assertSearchesIndex(self, allocate):
+        with CaptureQueriesContext(connection) as context:
+            allocate()
+        with connection.cursor() as cursor:
+            for query in context:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+                self.assertNotIn('SCAN', plan, query['sql'])
+
+    def test_allocate_slug(self):
+        self.assertSearchesIndex(
+            lambda: allocate_slug(Note.objects.all(), 'plan', 100)
+        )
+
+    def test_slug_allocator(self):
+        allocator = SlugAllocator(Note.objects.all(), 100)
+        self.assertSearchesIndex(lambda: allocator.allocate(['plan']))
+
+
+class TestSearchScope(TestCase):
+    """MATCH находит заметки автора, не просматривая заметки остальных."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f'Автор {i}') for i in range(SEARCH_AUTHORS)
+        )
+        cls.authors = list(User.objects.filter(username__startswith='Автор'))
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {i}',
+                text='Общий текст',
+                slug=f'{author.pk}-{i}',
+                author=author,
+            )
+            for author in cls.authors
+            for i in range(NOTES_PER_SEARCH_AUTHOR)
+        )
+        index_queryset(Note.objects.all())
+
+    def test_match_is_scoped_to_author(self):
+        author = self.authors[1]
+        own = set(
+            Note.objects.filter(author=author).values_list('pk', flat=True)
+        )
+        self.assertEqual(
+            {note.pk for note in search_notes(author, 'заметк', 100)}, own
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [build_match_query('заметк', author.pk)],
+            )
+            self.assertEqual({row[0] for row in cursor.fetchall()}, own)
+
+    def test_search_plan(self):
+        with CaptureQueriesContext(connection) as context:
+            search_notes(self.authors[0], 'текст', 10)
+        query, = context
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertTrue(
+            any('VIRTUAL TABLE INDEX' in step and ':M' in step
+                for step in plan),
+            plan,
+        )
+        self.assertIn(
+            'SEARCH note USING INTEGER PRIMARY KEY (rowid=?)', plan
+        )
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -18,10 +19,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'notes.apps.NotesConfig'
+    'notes.apps.NotesConfig',
+    # Общие шаблоны, например admin/cursor_change_list.html.
+    'yacommon',
 ]
 
 MIDDLEWARE = [
+    'yacommon.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +53,9 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать ли шаблоны при запуске, см. warm_up_templates().
+WARM_UP_TEMPLATES = False
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
@@ -56,9 +63,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Файл тестовой базы для pytest --reuse-db (быстрый режим
+        # run_tests.sh); по умолчанию тестовая база в памяти.
+        'TEST': {'NAME': os.environ.get('DJANGO_TEST_DB_NAME')},
     }
 }
 
+SQLITE_PRAGMAS = {}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +99,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_PAGE = 100
+
+# С каких адресов доступны метрики, см. yacommon.metrics.
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
@@ -0,0 +1,15 @@
+"""
+Настройки для боевого запуска ``yanote``.
+
+DJANGO_SETTINGS_MODULE=yanote.settings_production
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, TEMPLATES
+
+# Общие боевые значения идут поверх настроек проекта.
+from yacommon.settings_production import (DEBUG, SQLITE_PRAGMAS,  # noqa: F401
+                                          WARM_UP_TEMPLATES, cached_templates,
+                                          persistent_database)
+
+DATABASES = {'default': persistent_database(DATABASES['default'])}
+TEMPLATES = cached_templates(TEMPLATES)
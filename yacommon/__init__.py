@@ -0,0 +1,7 @@
+"""
+Код, общий для проектов ya_news и ya_note.
+
+Пакет лежит в корне репозитория; пакеты настроек обоих проектов
+добавляют корень в sys.path, поэтому он доступен из manage.py,
+WSGI/ASGI и тестов.
+"""
@@ -0,0 +1,87 @@
+"""Админка больших таблиц без OFFSET и COUNT(*) по всей выборке."""
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+
+from .db import estimated_row_count
+from .pagination import CursorPaginator, InvalidCursor
+
+CURSOR_VAR = 'cursor'
+
+
+class CursorChangeList(ChangeList):
+    """
+    Список объектов в админке с курсорной пагинацией.
+
+    COUNT(*) по всей выборке не выполняется: число объектов даёт
+    CursorPaginatedAdmin.estimate_count().
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        paginator = CursorPaginator(
+            self.queryset,
+            self.list_per_page,
+            self.model_admin.cursor_ordering,
+        )
+        try:
+            page = paginator.page(request.GET.get(CURSOR_VAR))
+        except InvalidCursor:
+            raise IncorrectLookupParameters
+        self.result_count, self.count_is_capped = (
+            self.model_admin.estimate_count(self)
+        )
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = page.object_list
+        self.can_show_all = False
+        self.multi_page = page.has_other_pages()
+        self.paginator = paginator
+        self.page = page
+
+    def cursor_url(self, cursor):
+        return self.get_query_string({CURSOR_VAR: cursor})
+
+    def next_url(self):
+        return self.cursor_url(self.page.next_cursor)
+
+    def previous_url(self):
+        return self.cursor_url(self.page.previous_cursor)
+
+
+class CursorPaginatedAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin для больших таблиц.
+
+    Страницы листаются по курсору, поэтому сортировка по колонкам
+    отключена, а порядок задаёт cursor_ordering.
+    """
+    change_list_template = 'admin/cursor_change_list.html'
+    cursor_ordering = ('-id',)
+    show_full_result_count = False
+    sortable_by = ()
+    # Больше стольких объектов точно не считаем.
+    count_limit = 1000
+
+    def get_changelist(self, request, **kwargs):
+        return CursorChangeList
+
+    def get_ordering(self, request):
+        return self.cursor_ordering
+
+    def estimate_count(self, changelist):
+        """
+        Число объектов в списке и признак, что оно обрезано count_limit.
+
+        Вся таблица оценивается по статистике базы, а отфильтрованный
+        список считается не дальше count_limit строк.
+        """
+        if not changelist.query and not changelist.get_filters_params():
+            return estimated_row_count(self.model), False
+        count = changelist.queryset.order_by()[:self.count_limit + 1].count()
+        return min(count, self.count_limit), count > self.count_limit
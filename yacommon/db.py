@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Max
+
+# Сколько параметров SQLite безопасно принимает в одном запросе.
+SQL_PARAMS_LIMIT = 900
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Применяет settings.SQLITE_PRAGMAS к каждому новому соединению."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def estimated_row_count(model):
+    """
+    Примерное число строк в таблице модели без COUNT(*).
+
+    SQLite хранит число строк в sqlite_stat1, которую заполняют
+    ANALYZE и PRAGMA optimize. Пока статистики нет, оценкой служит
+    наибольший первичный ключ: он берётся из индекса, но после удалений
+    завышает число строк.
+    """
+    connection = connections[router.db_for_read(model)]
+    table = model._meta.db_table
+    if (
+        connection.vendor == 'sqlite'
+        and 'sqlite_stat1' in connection.introspection.table_names()
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table],
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            return int(row[0].split()[0])
+    return model._default_manager.aggregate(last=Max('pk'))['last'] or 0
+
+
+def insert_rows(model, fields, rows):
+    """
+    Вставляет кортежи rows в поля fields модели одним executemany().
+
+    В отличие от bulk_create() не создаёт объекты модели и не
+    готовит каждое значение через поле, поэтому на миллионах строк
+    в разы быстрее. Значения должны быть уже в виде для базы: id
+    вместо объектов, даты в UTC. Сигналы и auto_now не срабатывают.
+    """
+    meta = model._meta
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(meta.get_field(name).column) for name in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) '
+            f'VALUES ({placeholders})',
+            rows,
+        )
+
+
+@contextmanager
+def deferred_indexes(model):
+    """
+    Удаляет неуникальные индексы таблицы модели на время блока.
+
+    Одна сборка индекса после вставки миллионов строк в разы быстрее,
+    чем правка индексов на каждой строке. Пересборка проходит по всей
+    таблице, поэтому выгодна, только если строк добавляется не меньше,
+    чем уже было. Работает только в SQLite, в других базах ничего
+    не делает.
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        # У автоматических индексов ограничений sql пустой.
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = %s AND sql IS NOT NULL "
+            "AND sql NOT LIKE 'CREATE UNIQUE%%'",
+            [model._meta.db_table],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+
+
+@contextmanager
+def keep_timestamps(model):
+    """
+    Сохраняет заданные даты в полях auto_now и auto_now_add модели.
+
+    bulk_create() перезаписывает их текущим временем, а загрузчикам
+    и генераторам данных нужны даты из файла или сгенерированные.
+    Меняет поля модели на время блока, поэтому не для кода запросов.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
@@ -0,0 +1,270 @@
+import asyncio
+from bisect import bisect_left
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNRESOLVED = '<unresolved>'
+# Границы корзин гистограмм: фиксированы, поэтому память на каждое
+# представление постоянна и не растёт с числом запросов.
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+# Сколько последних запросов каждого представления хранится для квантилей.
+RECENT_WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+HISTOGRAMS = (
+    (
+        'latency', 'http_request_duration_seconds',
+        'Полное время обработки запроса.', SECONDS_BUCKETS,
+    ),
+    (
+        'queries', 'http_request_db_queries',
+        'Число SQL-запросов за запрос.', QUERIES_BUCKETS,
+    ),
+    (
+        'db_time', 'http_request_db_duration_seconds',
+        'Время выполнения SQL-запросов.', SECONDS_BUCKETS,
+    ),
+    (
+        'template_time', 'http_request_template_duration_seconds',
+        'Время отрисовки шаблона, включая запросы из шаблона.',
+        SECONDS_BUCKETS,
+    ),
+)
+RECENT_LATENCY = (
+    'http_request_recent_duration_seconds',
+    f'Квантили времени обработки последних {RECENT_WINDOW} запросов.',
+)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами в формате Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        """Пары «граница le — накопленное число наблюдений»."""
+        total = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            total += count
+            yield bound, total
+
+
+class ViewMetrics:
+    """Метрики одного представления."""
+
+    def __init__(self):
+        self.histograms = {
+            field: Histogram(buckets)
+            for field, _, _, buckets in HISTOGRAMS
+        }
+        self.recent = deque(maxlen=RECENT_WINDOW)
+
+    def observe(self, sample):
+        for field, histogram in self.histograms.items():
+            value = getattr(sample, field)
+            if value is not None:
+                histogram.observe(value)
+        self.recent.append(sample.latency)
+
+
+class RequestSample:
+    """Измерения одного запроса."""
+    __slots__ = (
+        'latency', 'queries', 'db_time', 'template_time', 'render_started',
+    )
+
+    def __init__(self):
+        self.latency = 0
+        self.queries = 0
+        self.db_time = 0
+        # None, если ответ не отрисовывал шаблон.
+        self.template_time = None
+        self.render_started = None
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper(), считающая запросы."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += perf_counter() - started
+
+    def rendered(self, response):
+        self.template_time = perf_counter() - self.render_started
+
+
+# Замер текущего запроса; контекст копируется и в потоки, где
+# асинхронные представления выполняют синхронный код.
+CURRENT_SAMPLE = ContextVar('metrics_sample', default=None)
+
+
+@contextmanager
+def track_queries():
+    """Учитывает SQL-запросы текущего потока в замере текущего запроса."""
+    sample = CURRENT_SAMPLE.get()
+    with ExitStack() as stack:
+        if sample is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(sample.execute)
+                )
+        yield
+
+
+def track_render(response):
+    """Засекает время отрисовки TemplateResponse в замере текущего запроса."""
+    sample = CURRENT_SAMPLE.get()
+    if sample is not None and not response.is_rendered:
+        sample.render_started = perf_counter()
+        response.add_post_render_callback(sample.rendered)
+
+
+def _label(value):
+    return (
+        value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    )
+
+
+def _quantile(ordered, quantile):
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class MetricsRegistry:
+    """Потокобезопасное хранилище метрик по именам представлений."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._views = {}
+
+    def record(self, view_name, sample):
+        with self._lock:
+            metrics = self._views.get(view_name)
+            if metrics is None:
+                metrics = self._views[view_name] = ViewMetrics()
+            metrics.observe(sample)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def export(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            views = sorted(
+                (
+                    _label(name),
+                    {
+                        field: (list(histogram.samples()), histogram.sum)
+                        for field, histogram in metrics.histograms.items()
+                    },
+                    sorted(metrics.recent),
+                )
+                for name, metrics in self._views.items()
+            )
+        lines = []
+        for field, metric, help_text, _ in HISTOGRAMS:
+            lines += [
+                f'# HELP {metric} {help_text}',
+                f'# TYPE {metric} histogram',
+            ]
+            for view, histograms, _ in views:
+                samples, total = histograms[field]
+                lines += [
+                    f'{metric}_bucket{{view="{view}",le="{bound}"}} {count}'
+                    for bound, count in samples
+                ]
+                lines += [
+                    f'{metric}_sum{{view="{view}"}} {total}',
+                    f'{metric}_count{{view="{view}"}} {samples[-1][1]}',
+                ]
+        metric, help_text = RECENT_LATENCY
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} summary']
+        for view, _, recent in views:
+            lines += [
+                f'{metric}{{view="{view}",quantile="{quantile}"}} '
+                f'{_quantile(recent, quantile)}'
+                for quantile in QUANTILES
+            ]
+            lines += [
+                f'{metric}_sum{{view="{view}"}} {sum(recent)}',
+                f'{metric}_count{{view="{view}"}} {len(recent)}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    Собирает по каждому представлению число SQL-запросов, время в базе,
+    время отрисовки шаблона и полное время обработки запроса.
+
+    Ставится первым в MIDDLEWARE, чтобы учитывать и остальные
+    промежуточные слои. Работает и под WSGI, и под ASGI: в асинхронной
+    цепочке запросы к базе учитываются там, где код обёрнут в
+    track_queries(). Метрики отдаются представлением metrics().
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django 3.2 узнаёт асинхронный промежуточный слой.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = CURRENT_SAMPLE.set(RequestSample())
+        started = perf_counter()
+        with track_queries():
+            response = self.get_response(request)
+        self.record(request, started, token)
+        return response
+
+    async def __acall__(self, request):
+        token = CURRENT_SAMPLE.set(RequestSample())
+        started = perf_counter()
+        response = await self.get_response(request)
+        self.record(request, started, token)
+        return response
+
+    def record(self, request, started, token):
+        sample = CURRENT_SAMPLE.get()
+        sample.latency = perf_counter() - started
+        CURRENT_SAMPLE.reset(token)
+        match = request.resolver_match
+        REGISTRY.record(match.view_name if match else UNRESOLVED, sample)
+
+    def process_template_response(self, request, response):
+        track_render(response)
+        return response
+
+
+def metrics(request):
+    """Метрики для Prometheus; доступны только с METRICS_ALLOWED_IPS."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(REGISTRY.export(), content_type=CONTENT_TYPE)
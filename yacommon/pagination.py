@@ -0,0 +1,174 @@
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Сохраняет микросекунды, которые DjangoJSONEncoder отбрасывает."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(Exception):
+    """Курсор не удалось разобрать."""
+
+
+class CursorPage:
+    """Страница курсорной пагинации."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Курсорная (keyset) пагинация.
+
+    Вместо OFFSET страница начинается строго после граничной записи
+    предыдущей страницы, поэтому стоимость запроса не зависит от
+    номера страницы. ordering должен однозначно упорядочивать записи,
+    последним полем обычно идёт первичный ключ, а в базе должен быть
+    составной индекс по этим полям.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field) for field in self.fields]
+        raw = json.dumps([direction, values], cls=CursorEncoder)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            model_meta = self.queryset.model._meta
+            values = [
+                model_meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception as error:
+            raise InvalidCursor(cursor) from error
+        return direction, values
+
+    def _after(self, values, reverse=False):
+        """Условие «запись идёт после values» в порядке ordering."""
+        conditions = []
+        lookups = []
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith('-') != reverse
+            lookups.append('lt' if descending else 'gt')
+            condition = {
+                field: value
+                for field, value in zip(self.fields[:index], values)
+            }
+            condition[f'{self.fields[index]}__{lookups[index]}'] = (
+                values[index]
+            )
+            conditions.append(Q(**condition))
+        # Нестрогая граница по первому полю позволяет SQLite сузить
+        # проход по индексу, иначе OR превращается в полный скан.
+        leading = Q(**{f'{self.fields[0]}__{lookups[0]}e': values[0]})
+        return leading & reduce(or_, conditions)
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def page(self, cursor=None):
+        """Возвращает страницу, начинающуюся от cursor."""
+        if not cursor:
+            direction, values = NEXT, None
+        else:
+            direction, values = self.decode_cursor(cursor)
+        if direction == NEXT:
+            queryset = self.queryset.order_by(*self.ordering)
+            if values is not None:
+                queryset = queryset.filter(self._after(values))
+        else:
+            queryset = self.queryset.order_by(
+                *self._reversed_ordering()
+            ).filter(self._after(values, reverse=True))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+        has_next = has_more if direction == NEXT else True
+        has_previous = values is not None if direction == NEXT else has_more
+        return CursorPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1], NEXT) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], PREVIOUS)
+                if has_previous else None
+            ),
+        )
+
+
+class CursorPaginationMixin:
+    """Подменяет постраничную пагинацию ListView на курсорную."""
+    cursor_kwarg = 'cursor'
+    cursor_ordering = None
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(
+            queryset, page_size, self.get_cursor_ordering()
+        )
+        cursor = (
+            self.kwargs.get(self.cursor_kwarg)
+            or self.request.GET.get(self.cursor_kwarg)
+        )
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404('Некорректный курсор.')
+        return paginator, page, page.object_list, page.has_other_pages()
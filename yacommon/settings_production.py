@@ -0,0 +1,58 @@
+"""Боевые настройки, общие для обоих проектов, см. */settings_production.py."""
+import os
+from copy import deepcopy
+from pathlib import Path
+
+DEBUG = False
+
+# Применяются к каждому новому соединению, см. yacommon.db.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+WARM_UP_TEMPLATES = True
+
+
+def persistent_database(database):
+    """Настройки базы database с постоянным соединением."""
+    return {
+        **database,
+        # Соединение живёт между запросами, а не открывается на каждый.
+        'CONN_MAX_AGE': 600,
+        # Сколько секунд SQLite ждёт снятия блокировки записи.
+        'OPTIONS': {'timeout': 20},
+    }
+
+
+def shared_cache(base_dir):
+    """
+    Общий для всех процессов кеш в каталоге DJANGO_CACHE_DIR.
+
+    Ключ, удалённый при правке данных, должен пропасть у всех
+    процессов, а не только у того, где прошла правка.
+    """
+    return {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': Path(
+                os.environ.get('DJANGO_CACHE_DIR', base_dir / 'cache')
+            ),
+        }
+    }
+
+
+def cached_templates(templates):
+    """Копия TEMPLATES, где шаблоны разбираются раз за жизнь процесса."""
+    templates = deepcopy(templates)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    return templates
@@ -0,0 +1,79 @@
+"""Заготовки для команд generate_data обоих проектов."""
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+
+from .db import SQL_PARAMS_LIMIT, deferred_indexes, estimated_row_count
+
+
+def zipf_counts(total, size, exponent, rng):
+    """
+    Раскладывает total объектов по size владельцам по закону Ципфа.
+
+    Владелец ранга r получает долю, пропорциональную 1 / r ** exponent;
+    при exponent = 0 распределение равномерное. Ранги перемешиваются
+    rng, чтобы популярные владельцы не шли подряд.
+    """
+    if not size:
+        return []
+    weights = [rank ** -exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in range(total - sum(counts)):
+        counts[index % size] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def chunked(iterable, size):
+    """Списки по size элементов из iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def text(rng, phrases, sentences=3):
+    """Текст из случайного числа фраз phrases, от одной до sentences."""
+    return ' '.join(
+        rng.choice(phrases) for _ in range(rng.randint(1, sentences))
+    )
+
+
+def create_users(count, prefix):
+    """
+    Создаёт пользователей prefix0, prefix1, … и возвращает их id.
+
+    Уже существующие имена пропускаются, поэтому повторный запуск
+    с теми же параметрами новых пользователей не создаёт.
+    """
+    User = get_user_model()
+    usernames = [f'{prefix}{index}' for index in range(count)]
+    # Пароль, начинающийся с «!», непригоден для входа.
+    User.objects.bulk_create(
+        (User(username=username, password='!') for username in usernames),
+        ignore_conflicts=True,
+    )
+    ids = {}
+    for chunk in chunked(usernames, SQL_PARAMS_LIMIT):
+        ids.update(
+            User.objects.filter(username__in=chunk)
+            .values_list('username', 'pk')
+        )
+    return [ids[username] for username in usernames]
+
+
+def bulk_load(model, added):
+    """
+    (rebuild, контекст) для вставки added строк в таблицу model.
+
+    Если строк добавляется больше, чем было, индексы таблицы и
+    поисковый индекс дешевле собрать заново, чем дополнять: тогда
+    rebuild истинно, а контекст снимает индексы таблицы на время
+    вставки. Поисковый индекс команда перестраивает сама.
+    """
+    rebuild = added >= estimated_row_count(model)
+    return rebuild, deferred_indexes(model) if rebuild else nullcontext()
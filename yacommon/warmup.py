@@ -0,0 +1,50 @@
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов DIRS движка."""
+    for directory in map(Path, engine.engine.dirs):
+        for path in sorted(directory.rglob('*.html')):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_up_templates():
+    """
+    Компилирует все шаблоны из DIRS.
+
+    С кэширующим загрузчиком скомпилированные шаблоны остаются в памяти,
+    и первый запрос не тратит время на разбор. Кэш загрузчиков
+    предварительно сбрасывается, поэтому возвращаемый словарь
+    «имя шаблона — время компиляции в секундах» отражает полный разбор.
+    """
+    timings = {}
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for loader in engine.engine.template_loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+        for name in template_names(engine):
+            started = time.perf_counter()
+            engine.get_template(name)
+            timings[name] = time.perf_counter() - started
+    return timings
+
+
+def warm_up_if_enabled():
+    """Прогревает шаблоны при запуске, если включён WARM_UP_TEMPLATES."""
+    if not settings.WARM_UP_TEMPLATES:
+        return
+    timings = warm_up_templates()
+    logger.info(
+        'Скомпилировано шаблонов: %d за %.2f мс',
+        len(timings), sum(timings.values()) * 1000,
+    )